@@ -1,6 +1,5 @@
 import os
 import sys
-import django
 from dotenv import load_dotenv
 
 # Add the project directory to the Python path
@@ -10,8 +9,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
 
 # Set the Django settings module
+# django.setup() is skipped on purpose: opening a connection only needs
+# settings.DATABASES, not the app registry or models.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'field_inspection.settings')
-django.setup()
 
 # Try to connect to the database
 from django.db import connections
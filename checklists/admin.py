@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
+from .admin_paginators import FasterAdminPaginator
 from .models import (
     InspectionPDF,
     InspectionSystem,
@@ -9,11 +11,51 @@ from .models import (
     TaskResult,
     TaskPhoto
 )
+from sectors.models import Sector
+from users.models import SupabaseUser
+
+PHOTO_PREVIEW_HTML = '<img src="{}" width="150" height="auto" />'
+
+
+class SectorFilter(admin.SimpleListFilter):
+    """
+    Sidebar filter on sector, listing sectors by id and name only.
+    Subclasses set sector_lookup to the path from the admin's model to its sector.
+    """
+    title = 'sector'
+    parameter_name = 'sector'
+    sector_lookup = None
+
+    def lookups(self, request, model_admin):
+        return Sector.objects.values_list('id', 'name')
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.sector_lookup: self.value()})
+        return queryset
+
+
+class PDFSectorFilter(SectorFilter):
+    sector_lookup = 'pdf__sector'
+
+
+class SystemSectorFilter(SectorFilter):
+    sector_lookup = 'system__pdf__sector'
+
+
+class ExecutionSectorFilter(SectorFilter):
+    sector_lookup = 'execution__assignment__sector'
+
+
+class TaskResultSectorFilter(SectorFilter):
+    sector_lookup = 'task_result__execution__assignment__sector'
 
 
 @admin.register(InspectionPDF)
 class InspectionPDFAdmin(admin.ModelAdmin):
     list_display = ('title', 'sector', 'uploaded_by', 'upload_date', 'processed', 'system_count')
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
     list_filter = ('processed', 'sector', 'upload_date')
     search_fields = ('title', 'description', 'uploaded_by__email')
     readonly_fields = ('upload_date', 'processed', 'processing_errors')
@@ -26,10 +68,15 @@ class InspectionPDFAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('processing_errors').annotate(
+            _system_count=Count('inspection_systems')
+        )
+
     def system_count(self, obj):
-        count = obj.inspection_systems.count()
-        return count
+        return obj._system_count
     system_count.short_description = 'Systems'
+    system_count.admin_order_field = '_system_count'
     
 
 class ChecklistTaskInline(admin.TabularInline):
@@ -41,21 +88,32 @@ class ChecklistTaskInline(admin.TabularInline):
 @admin.register(InspectionSystem)
 class InspectionSystemAdmin(admin.ModelAdmin):
     list_display = ('name', 'pdf', 'task_count', 'created_at')
-    list_filter = ('pdf__sector', 'created_at')
+    list_filter = (PDFSectorFilter, 'created_at')
     search_fields = ('name', 'description', 'pdf__title')
     readonly_fields = ('created_at', 'task_count')
     inlines = [ChecklistTaskInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_task_count=Count('tasks'))
+
     def task_count(self, obj):
-        return obj.tasks.count()
+        return obj._task_count
     task_count.short_description = 'Tasks'
+    task_count.admin_order_field = '_task_count'
 
 
 @admin.register(ChecklistTask)
 class ChecklistTaskAdmin(admin.ModelAdmin):
     list_display = ('number', 'description_truncated', 'system')
-    list_filter = ('system__pdf__sector', 'system')
+    list_filter = (SystemSectorFilter, 'system')
     search_fields = ('description', 'system__name')
+
+    def get_queryset(self, request):
+        # description cannot be deferred or cut down to a Substr: the action
+        # checkbox renders str(obj) for every row, which reads it
+        return super().get_queryset(request).select_related('system').only(
+            'number', 'description', 'system', 'system__name'
+        )
     
     def description_truncated(self, obj):
         if len(obj.description) > 100:
@@ -70,6 +128,9 @@ class TaskResultInline(admin.TabularInline):
     readonly_fields = ('task', 'status', 'notes', 'completed_at')
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('task')
+
     def has_add_permission(self, request, obj=None):
         return False
 
@@ -77,6 +138,7 @@ class TaskResultInline(admin.TabularInline):
 @admin.register(ChecklistAssignment)
 class ChecklistAssignmentAdmin(admin.ModelAdmin):
     list_display = ('title', 'technician', 'sector', 'due_date', 'status', 'assigned_by')
+    list_select_related = ('technician', 'assigned_by', 'sector')
     list_filter = ('status', 'sector', 'due_date')
     search_fields = ('title', 'description', 'technician__email', 'assigned_by__email')
     readonly_fields = ('created_at', 'updated_at')
@@ -93,6 +155,12 @@ class ChecklistAssignmentAdmin(admin.ModelAdmin):
         }),
     )
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in ('technician', 'assigned_by'):
+            # Only the columns used by SupabaseUser.__str__ are needed for the dropdown
+            kwargs['queryset'] = SupabaseUser.objects.only('id', 'email', 'first_name', 'last_name', 'role')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 
 @admin.register(ChecklistExecution)
 class ChecklistExecutionAdmin(admin.ModelAdmin):
@@ -101,6 +169,12 @@ class ChecklistExecutionAdmin(admin.ModelAdmin):
     search_fields = ('assignment__title', 'notes')
     readonly_fields = ('assignment', 'technician', 'started_at', 'completed_at', 'submitted_at', 'progress_percentage')
     inlines = [TaskResultInline]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('assignment', 'technician').annotate(
+            _total_results=Count('task_results'),
+            _done_results=Count('task_results', filter=~Q(task_results__status='pending')),
+        )
     
     def assignment_title(self, obj):
         return obj.assignment.title
@@ -111,7 +185,10 @@ class ChecklistExecutionAdmin(admin.ModelAdmin):
     technician_name.short_description = 'Technician'
     
     def progress(self, obj):
-        percentage = obj.progress_percentage
+        if obj._total_results == 0:
+            percentage = 0
+        else:
+            percentage = int((obj._done_results / obj._total_results) * 100)
         color = 'green' if percentage == 100 else 'orange' if percentage > 50 else 'red'
         return format_html(
             '<div style="width:100px; background-color: #f1f1f1; border-radius: 4px;">'
@@ -130,7 +207,7 @@ class TaskPhotoInline(admin.TabularInline):
 
     def photo_preview(self, obj):
         if obj.file_path:
-            return format_html('<img src="{}" width="150" height="auto" />', obj.file_path)
+            return format_html(PHOTO_PREVIEW_HTML, obj.file_path)
         return "No Photo"
     photo_preview.short_description = 'Preview'
 
@@ -138,10 +215,16 @@ class TaskPhotoInline(admin.TabularInline):
 @admin.register(TaskResult)
 class TaskResultAdmin(admin.ModelAdmin):
     list_display = ('task_info', 'status', 'execution_title', 'technician', 'photo_count', 'completed_at')
-    list_filter = ('status', 'execution__assignment__sector', 'execution__technician')
+    list_select_related = ('task', 'execution__assignment', 'execution__technician')
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
+    list_filter = ('status', ExecutionSectorFilter, 'execution__technician')
     search_fields = ('task__description', 'notes', 'execution__assignment__title')
     readonly_fields = ('execution', 'task', 'completed_at', 'created_at', 'updated_at')
     inlines = [TaskPhotoInline]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_photo_count=Count('photos'))
     
     def task_info(self, obj):
         return f"{obj.task.number}. {obj.task.description[:50]}..."
@@ -156,17 +239,27 @@ class TaskResultAdmin(admin.ModelAdmin):
     technician.short_description = 'Technician'
     
     def photo_count(self, obj):
-        return obj.photos.count()
+        return obj._photo_count
     photo_count.short_description = 'Photos'
+    photo_count.admin_order_field = '_photo_count'
 
 
 @admin.register(TaskPhoto)
 class TaskPhotoAdmin(admin.ModelAdmin):
     list_display = ('id', 'task_result_info', 'caption', 'photo_preview', 'uploaded_at')
-    list_filter = ('uploaded_at', 'task_result__execution__assignment__sector')
+    list_select_related = ('task_result__task',)
+    paginator = FasterAdminPaginator
+    show_full_result_count = False
+    list_filter = ('uploaded_at', TaskResultSectorFilter)
     search_fields = ('caption', 'task_result__task__description')
     readonly_fields = ('photo_preview', 'uploaded_at')
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'task_result':
+            # TaskResult.__str__ renders its task, so join it for the dropdown
+            kwargs['queryset'] = TaskResult.objects.select_related('task')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
     def task_result_info(self, obj):
         task = obj.task_result.task
         return f"{task.number}. {task.description[:50]}..."
@@ -174,6 +267,6 @@ class TaskPhotoAdmin(admin.ModelAdmin):
 
     def photo_preview(self, obj):
         if obj.file_path:
-            return format_html('<img src="{}" width="150" height="auto" />', obj.file_path)
+            return format_html(PHOTO_PREVIEW_HTML, obj.file_path)
         return "No Photo"
     photo_preview.short_description = 'Preview'
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""
+Shared Runtime for the AI Services
+One background event loop, one pooled HTTP client per process, the result cache and
+helpers for prompts and streamed responses, used by every AI service
+"""
+
+import asyncio
+import atexit
+import functools
+import hashlib
+import logging
+import threading
+import weakref
+from collections import Counter
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+
+from .ai_schemas import AIExtractionResult
+
+logger = logging.getLogger(__name__)
+
+# Model results (and the cloud service's extracted PDF text) are reused for identical inputs;
+# prompts run at temperature 0.1, so results are deterministic enough to share
+AI_RESULT_CACHE_TIMEOUT = getattr(settings, 'AI_RESULT_CACHE_TIMEOUT', 60 * 60 * 24)
+# Cache hit/miss counts are logged every this many lookups
+CACHE_STATS_LOG_INTERVAL = 50
+
+# Prompt sizes are estimated at ~4 characters per token, since the Llama-family
+# tokenizers used by the local and cloud models aren't available here
+CHARS_PER_TOKEN = 4
+
+# One pooled client per event loop; an AsyncClient can't be shared across loops
+_http_clients = weakref.WeakKeyDictionary()
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled AsyncClient for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        # HTTP/2 where the provider offers it, so TLS connections are reused across requests.
+        # The transport also retries failed connection attempts, e.g. while Ollama restarts.
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        )
+        _http_clients[loop] = client
+    return client
+
+# Long-lived event loop that runs AI calls for synchronous (WSGI) callers
+_loop = None
+_loop_lock = threading.Lock()
+
+def run_async(coro):
+    """Run a coroutine on the background AI event loop and wait for its result"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='ai-loop', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+@atexit.register
+def _close_http_client() -> None:
+    """Close the background loop's client on shutdown so its connections end cleanly"""
+    client = _http_clients.get(_loop) if _loop is not None else None
+    if client is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(client.aclose(), _loop).result(timeout=5)
+    except Exception as e:
+        logger.debug(f"Could not close AI HTTP client: {e}")
+
+# Hit/miss counts per cache namespace
+_cache_stats = Counter()
+
+def cached_result(namespace: str, model_name: str):
+    """
+    Cache a model's successful results by document type and normalized document text
+    
+    Prompts are deterministic (temperature 0.1), so a re-uploaded PDF, or one that
+    differs only in whitespace, is answered without another model round trip or
+    spending free-tier quota. The decorated method takes the document text and type
+    as its last two arguments.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args) -> AIExtractionResult:
+            text_content, document_type = args[-2:]
+            normalized_text = " ".join(text_content.split())
+            key_digest = hashlib.sha256(f"{model_name}|{document_type}|{normalized_text}".encode()).hexdigest()
+            cache_key = f"{namespace}:{key_digest}"
+            
+            cached = await cache.aget(cache_key)
+            _cache_stats[namespace, "hits" if cached is not None else "misses"] += 1
+            hits, misses = _cache_stats[namespace, "hits"], _cache_stats[namespace, "misses"]
+            if (hits + misses) % CACHE_STATS_LOG_INTERVAL == 0:
+                logger.info(f"{namespace} result cache: {hits} hits, {misses} misses")
+            if cached is not None:
+                logger.info(f"{namespace} cache hit for {model_name}")
+                return AIExtractionResult.model_validate_json(cached)
+            
+            result = await method(self, *args)
+            if result.success:
+                await cache.aset(cache_key, result.model_dump_json(), AI_RESULT_CACHE_TIMEOUT)
+            return result
+        return wrapper
+    return decorator
+
+class JSONObjectScanner:
+    """Collects streamed text and spots where the first top-level JSON object ends"""
+    
+    def __init__(self):
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """Add a chunk of streamed text; returns True once the object is complete"""
+        start = 0 if self._depth else text.find('{')
+        if start < 0:
+            return False
+        
+        for i in range(start, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(text[start:i + 1])
+                    return True
+        
+        self._parts.append(text[start:])
+        return False
+    
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
@@ -4,10 +4,19 @@ Settings and configuration for AI service integration
 """
 
 import os
+from types import MappingProxyType
 from django.conf import settings
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+# Parsed once at import; is_ai_enabled() is called on request paths
+ENABLE_AI = os.getenv('ENABLE_AI_PROCESSING', 'true').lower() == 'true'
+
 # AI Service Configuration
-AI_CONFIG = {
+AI_CONFIG = MappingProxyType({
     # OpenAI Configuration
     'OPENAI': {
         'API_KEY': os.getenv('OPENAI_API_KEY', ''),
@@ -43,7 +52,7 @@ AI_CONFIG = {
     
     # Processing Configuration
     'PROCESSING': {
-        'ENABLE_AI': os.getenv('ENABLE_AI_PROCESSING', 'true').lower() == 'true',
+        'ENABLE_AI': ENABLE_AI,
         'MIN_CONFIDENCE_THRESHOLD': float(os.getenv('AI_MIN_CONFIDENCE', '0.5')),
         'MAX_PDF_SIZE_MB': int(os.getenv('MAX_PDF_SIZE_MB', '50')),
         'MAX_PAGES': int(os.getenv('MAX_PDF_PAGES', '20')),
@@ -66,7 +75,7 @@ AI_CONFIG = {
         'MAX_SYSTEMS_ALLOWED': int(os.getenv('AI_MAX_SYSTEMS', '50')),
         'MAX_TASKS_PER_SYSTEM': int(os.getenv('AI_MAX_TASKS_PER_SYSTEM', '100')),
     }
-}
+})
 
 # Service Priority Order
 AI_SERVICE_PRIORITY = [
@@ -75,6 +84,12 @@ AI_SERVICE_PRIORITY = [
     'GOOGLE',    # Tertiary - cost-effective for high volume
 ]
 
+# Services with a plausible API key, resolved once since keys only come from the environment
+_AVAILABLE_SERVICES = tuple(
+    service for service in AI_SERVICE_PRIORITY
+    if len(AI_CONFIG.get(service, {}).get('API_KEY', '')) > 10  # Basic validation
+)
+
 def get_ai_config(service: str = None) -> dict:
     """
     Get AI configuration for a specific service or all services
@@ -91,20 +106,21 @@ def get_ai_config(service: str = None) -> dict:
 
 def is_ai_enabled() -> bool:
     """Check if AI processing is enabled"""
-    return AI_CONFIG['PROCESSING']['ENABLE_AI']
+    return ENABLE_AI
 
 def get_available_services() -> list:
     """Get list of available AI services based on API keys"""
-    available = []
-    
-    for service in AI_SERVICE_PRIORITY:
-        config = AI_CONFIG.get(service, {})
-        api_key = config.get('API_KEY', '')
-        
-        if api_key and len(api_key) > 10:  # Basic validation
-            available.append(service)
-    
-    return available
+    return list(_AVAILABLE_SERVICES)
+
+# Estimated USD cost per PDF page for each service (constants, so computed once)
+_COST_PER_PAGE = {
+    # ~1000 tokens per page
+    'OPENAI': 1000 * AI_CONFIG['OPENAI']['COST_PER_1K_TOKENS'] / 1000,
+    # ~800 tokens per page, Claude is more efficient
+    'CLAUDE': 800 * AI_CONFIG['CLAUDE']['COST_PER_1K_TOKENS'] / 1000,
+    # Page-based pricing
+    'GOOGLE': AI_CONFIG['GOOGLE']['COST_PER_PAGE'],
+}
 
 def estimate_processing_cost(pdf_pages: int, service: str = 'OPENAI') -> float:
     """
@@ -117,26 +133,7 @@ def estimate_processing_cost(pdf_pages: int, service: str = 'OPENAI') -> float:
     Returns:
         Estimated cost in USD
     """
-    service_config = get_ai_config(service)
-    
-    if service == 'OPENAI':
-        # Estimate based on tokens (rough approximation)
-        estimated_tokens = pdf_pages * 1000  # ~1000 tokens per page
-        cost_per_token = service_config.get('COST_PER_1K_TOKENS', 0.01) / 1000
-        return estimated_tokens * cost_per_token
-        
-    elif service == 'CLAUDE':
-        # Similar token-based estimation
-        estimated_tokens = pdf_pages * 800  # Claude is more efficient
-        cost_per_token = service_config.get('COST_PER_1K_TOKENS', 0.008) / 1000
-        return estimated_tokens * cost_per_token
-        
-    elif service == 'GOOGLE':
-        # Page-based pricing
-        cost_per_page = service_config.get('COST_PER_PAGE', 0.0015)
-        return pdf_pages * cost_per_page
-    
-    return 0.0
+    return pdf_pages * _COST_PER_PAGE.get(service, 0.0)
 
 def validate_pdf_for_ai_processing(pdf_path: str) -> tuple[bool, str]:
     """
@@ -162,20 +159,15 @@ def validate_pdf_for_ai_processing(pdf_path: str) -> tuple[bool, str]:
         if file_size_mb > max_size:
             return False, f"PDF too large ({file_size_mb:.1f}MB > {max_size}MB)"
         
-        # Check page count if PyMuPDF is available
-        try:
-            import fitz
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            doc.close()
+        # Check page count if PyMuPDF is available (skipped otherwise)
+        if fitz is not None:
+            # page_count comes from the page tree; no pages are loaded
+            with fitz.open(pdf_path) as doc:
+                page_count = doc.page_count
             
             max_pages = AI_CONFIG['PROCESSING']['MAX_PAGES']
             if page_count > max_pages:
                 return False, f"Too many pages ({page_count} > {max_pages})"
-                
-        except ImportError:
-            # PyMuPDF not available, skip page count check
-            pass
         
         return True, "Valid for AI processing"
         
@@ -4,7 +4,7 @@ Defines the exact JSON structure that AI services should return
 """
 
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 import json
 from enum import Enum
 
@@ -31,7 +31,8 @@ class TaskSchema(BaseModel):
     safety_notes: Optional[str] = Field(None, description="Safety considerations for this task")
     estimated_time: Optional[int] = Field(None, description="Estimated time in minutes")
 
-    @validator('description')
+    @field_validator('description')
+    @classmethod
     def validate_description(cls, v):
         if len(v.strip()) < 10:
             raise ValueError('Task description must be at least 10 characters')
@@ -47,11 +48,13 @@ class SystemSchema(BaseModel):
     model: Optional[str] = Field(None, description="Model number or identifier")
     tasks: List[TaskSchema] = Field(..., description="List of inspection tasks for this system")
 
-    @validator('name')
+    @field_validator('name')
+    @classmethod
     def validate_name(cls, v):
         return v.strip()
 
-    @validator('tasks')
+    @field_validator('tasks')
+    @classmethod
     def validate_tasks(cls, v):
         if not v:
             raise ValueError('System must have at least one task')
@@ -82,28 +85,19 @@ class AIExtractionResult(BaseModel):
     extraction_quality: Optional[QualityLevel] = Field(None, description="Quality assessment")
     warnings: Optional[List[str]] = Field(None, description="Any warnings during processing")
 
-    @validator('systems')
+    @field_validator('systems')
+    @classmethod
     def validate_systems(cls, v):
         if not v:
             raise ValueError('At least one system must be extracted')
         return v
 
-    @validator('total_systems', always=True)
-    def validate_total_systems(cls, v, values):
-        return len(values.get('systems', []))
-
-    @validator('total_tasks', always=True)
-    def validate_total_tasks_count(cls, v, values):
-        return sum(len(system.tasks) for system in values.get('systems', []))
-    
-    @validator('total_tasks')
-    def validate_total_tasks(cls, v, values):
-        """Ensure total_tasks matches actual task count"""
-        if 'systems' in values:
-            actual_count = sum(len(system.tasks) for system in values['systems'])
-            if v != actual_count:
-                return actual_count
-        return v
+    @model_validator(mode='after')
+    def validate_totals(self):
+        """Ensure total_systems and total_tasks match the extracted systems"""
+        self.total_systems = len(self.systems)
+        self.total_tasks = sum(len(system.tasks) for system in self.systems)
+        return self
 
 # AI Prompt Templates
 AI_EXTRACTION_PROMPT = """
@@ -155,13 +149,8 @@ Notes:
 - Don't summarize or guess — extract only what is explicitly present.
 """
 
-def get_ai_prompt_for_document_type(doc_type: str = "general") -> str:
-    """Get dynamic prompt that adapts to any document type"""
-
-    base_prompt = AI_EXTRACTION_PROMPT
-
-    # Add dynamic guidance based on detected document characteristics
-    dynamic_guidance = """
+# Adaptive guidance appended to the extraction prompt
+_DYNAMIC_GUIDANCE = """
 
 ADAPTIVE PROCESSING INSTRUCTIONS:
 Based on the document content, intelligently adapt your extraction approach:
@@ -205,7 +194,12 @@ Based on the document content, intelligently adapt your extraction approach:
 REMEMBER: Your goal is to be a smart document reader, not a template filler!
 """
 
-    return base_prompt + dynamic_guidance
+# The prompt does not depend on the document type yet, so build it once
+_FULL_PROMPT = AI_EXTRACTION_PROMPT + _DYNAMIC_GUIDANCE
+
+def get_ai_prompt_for_document_type(doc_type: str = "general") -> str:
+    """Get dynamic prompt that adapts to any document type"""
+    return _FULL_PROMPT
 
 def validate_ai_response(response_data: Dict[str, Any]) -> tuple[bool, str, Optional[AIExtractionResult]]:
     """
@@ -216,7 +210,7 @@ def validate_ai_response(response_data: Dict[str, Any]) -> tuple[bool, str, Opti
     """
     try:
         # Parse and validate using Pydantic
-        result = AIExtractionResult(**response_data)
+        result = AIExtractionResult.model_validate(response_data)
         return True, "Valid", result
     
     except Exception as e:
@@ -4,15 +4,27 @@ Handles integration with multiple AI providers for intelligent document processi
 """
 
 import os
+import asyncio
+import atexit
+import random
 import base64
-import json
+import functools
+import hashlib
 import time
 import logging
-from typing import Optional, Dict, Any, List, Tuple
-from io import BytesIO
+import threading
+import weakref
+from collections import OrderedDict
+from itertools import islice
+from typing import Optional, Dict, Any, Iterator, List, Set, Tuple
+from io import BytesIO, StringIO
 import fitz  # PyMuPDF
-import requests
+import httpx
+import orjson
+from PIL import Image
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
 from django.core.files.storage import default_storage
 
 from .ai_schemas import (
@@ -21,13 +33,311 @@ from .ai_schemas import (
     create_fallback_result,
     get_ai_prompt_for_document_type
 )
+from .ai_common import AI_RESULT_CACHE_TIMEOUT, get_http_client, run_async
+from .pdf_workers import MAX_PDF_WORKERS, PAGE_IMAGE_JPEG_QUALITY, get_pdf_pool, render_page
 
 logger = logging.getLogger(__name__)
 
+# The prompt is a prefix-cache key for both providers, so keep one string object per document type
+_prompt = functools.lru_cache(maxsize=32)(get_ai_prompt_for_document_type)
+
+# (service, label, minimum confidence) in order of preference; None accepts any successful result
+AI_SERVICES = (
+    ('openai', 'OpenAI', 0.7),
+    ('claude', 'Claude', 0.6),
+    ('google', 'Google Document AI', None),
+)
+AI_SERVICE_LABELS = {name: label for name, label, _ in AI_SERVICES}
+AI_SERVICE_MIN_CONFIDENCE = {name: threshold for name, _, threshold in AI_SERVICES}
+
+# PDFs whose text layer exceeds both limits go to the text services without OpenAI Vision
+TEXT_HEAVY_MIN_CHARS = getattr(settings, 'AI_TEXT_HEAVY_MIN_CHARS', 500)
+TEXT_HEAVY_MIN_LINES = getattr(settings, 'AI_TEXT_HEAVY_MIN_LINES', 20)
+
+# Characters of PDF text sent to the text models, to avoid token limits
+MAX_TEXT_LENGTH = 50000
+
+# Page images sent to OpenAI per document, for cost control
+OPENAI_MAX_IMAGES = 5
+
+# PDF pages tiled into each image sent to OpenAI (1-4). Tiling cuts vision tokens and
+# request size but shrinks each page, so it is opt-in per deployment.
+OPENAI_PAGES_PER_IMAGE = max(1, min(4, int(getattr(settings, 'AI_OPENAI_PAGES_PER_IMAGE', 1))))
+
+# Responses that say nothing about the request itself, and are worth retrying
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 3
+RETRY_INITIAL_WAIT = 1
+# Longest Retry-After honoured; a provider asking for more is treated as down
+RETRY_MAX_AFTER = 30
+
+# Concurrent Claude requests arriving within the window are sent as one multi-document
+# message. Off (1) by default: it trades per-document output budget for fewer requests
+# under rate limits, so enable it only where bursts of small checklists are common.
+CLAUDE_MICROBATCH_SIZE = max(1, int(getattr(settings, 'AI_CLAUDE_MICROBATCH_SIZE', 1)))
+CLAUDE_MICROBATCH_WINDOW = getattr(settings, 'AI_CLAUDE_MICROBATCH_WINDOW_MS', 50) / 1000
+
+# Message batches usually end within an hour and expire after 24 hours
+CLAUDE_BATCH_POLL_INTERVAL = getattr(settings, 'AI_CLAUDE_BATCH_POLL_INTERVAL', 30)
+CLAUDE_BATCH_TIMEOUT = getattr(settings, 'AI_CLAUDE_BATCH_TIMEOUT', 60 * 60 * 24)
+
+# Recently read PDFs kept in memory, keyed by (path, mtime), up to this many bytes in
+# total; a larger PDF is read for each use rather than cached
+PDF_BYTES_CACHE_MAX_BYTES = getattr(settings, 'AI_PDF_BYTES_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+
+PAGE_IMAGE_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+# What reading a PDF can raise: a missing local file, or a storage name the backend
+# rejects, can't find or can't serve
+PDF_READ_ERRORS = (OSError, SuspiciousFileOperation, NotImplementedError)
+
+_pdf_bytes_cache: 'OrderedDict[Tuple[str, float], bytes]' = OrderedDict()
+_pdf_bytes_cache_size = 0
+_pdf_bytes_lock = threading.Lock()
+
+def _load_pdf_bytes(pdf_path: str) -> bytes:
+    """
+    Read a PDF into memory once, whether it is a local path or a storage name
+    
+    The hash, the shared document and the text fallback all open the same bytes,
+    so remote storage is fetched once per file version rather than per use.
+    Raises one of PDF_READ_ERRORS if the file can't be read.
+    """
+    global _pdf_bytes_cache_size
+    if os.path.isfile(pdf_path):
+        key = (pdf_path, os.path.getmtime(pdf_path))
+        opener = lambda: open(pdf_path, 'rb')
+    else:
+        try:
+            key = (pdf_path, default_storage.get_modified_time(pdf_path).timestamp())
+        except NotImplementedError:
+            # Without a modification time a cached copy could be stale, so don't cache
+            key = None
+        opener = lambda: default_storage.open(pdf_path, 'rb')
+    
+    if key is not None:
+        with _pdf_bytes_lock:
+            data = _pdf_bytes_cache.get(key)
+            if data is not None:
+                _pdf_bytes_cache.move_to_end(key)
+                return data
+    
+    with opener() as f:
+        data = f.read()
+    
+    if key is not None and len(data) <= PDF_BYTES_CACHE_MAX_BYTES:
+        with _pdf_bytes_lock:
+            if key not in _pdf_bytes_cache:
+                _pdf_bytes_cache[key] = data
+                _pdf_bytes_cache_size += len(data)
+                while _pdf_bytes_cache_size > PDF_BYTES_CACHE_MAX_BYTES:
+                    _, evicted = _pdf_bytes_cache.popitem(last=False)
+                    _pdf_bytes_cache_size -= len(evicted)
+    return data
+
+def _open_pdf_document(pdf_path: str) -> fitz.Document:
+    """Open a PDF with PyMuPDF from its in-memory bytes"""
+    return fitz.open(stream=_load_pdf_bytes(pdf_path), filetype="pdf")
+
+def _tile_page_images(images: List[bytes]) -> bytes:
+    """Tile up to four rendered pages into a two-column grid JPEG"""
+    pages = [Image.open(BytesIO(img_data)) for img_data in images]
+    cell_width = max(page.width for page in pages)
+    cell_height = max(page.height for page in pages)
+    columns = 2
+    rows = (len(pages) + columns - 1) // columns
+    
+    grid = Image.new('RGB', (cell_width * columns, cell_height * rows), 'white')
+    for i, page in enumerate(pages):
+        grid.paste(page, ((i % columns) * cell_width, (i // columns) * cell_height))
+    
+    buffer = BytesIO()
+    grid.save(buffer, 'JPEG', quality=PAGE_IMAGE_JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+class _ClaudeMicroBatcher:
+    """
+    Coalesces Claude requests made within a short window into one message.
+    
+    Every caller shares the background event loop, so uploads processed in
+    different threads still land in the same batch.
+    """
+    
+    def __init__(self, processor: 'AIDocumentProcessor'):
+        self.processor = processor
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, so in-flight sends are held here
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, text_content: str, document_type: str) -> AIExtractionResult:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text_content, document_type, future))
+        if len(self._pending) >= CLAUDE_MICROBATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(CLAUDE_MICROBATCH_WINDOW, self._flush)
+        return await future
+    
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        
+        # Documents can only share a message if they share the prompt
+        by_type: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        for text_content, document_type, future in pending:
+            if not future.done():  # Cancelled once another service won the race
+                by_type.setdefault(document_type, []).append((text_content, future))
+        for document_type, items in by_type.items():
+            task = asyncio.ensure_future(self._send(document_type, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def aclose(self) -> None:
+        """Send the requests still waiting for the window and wait for every batch in flight"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    async def _send(self, document_type: str, items: List[Tuple[str, asyncio.Future]]) -> None:
+        processor = self.processor
+        try:
+            if len(items) == 1:
+                payload = processor._claude_request_params(items[0][0], document_type)
+                results = [processor._parse_claude_content(await processor._request_claude(payload))]
+            else:
+                payload = processor._claude_batch_request_params([text for text, _ in items], document_type)
+                results = processor._parse_claude_batch_content(await processor._request_claude(payload), len(items))
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
 class AIServiceError(Exception):
     """Custom exception for AI service errors"""
     pass
 
+class AIProviderUnavailable(AIServiceError):
+    """The provider itself failed (rate limit, server error or network), not the document"""
+    pass
+
+
+def _check_response(response: httpx.Response, error_label: str) -> None:
+    """Raise for a non-200 provider response, flagging outages separately"""
+    if response.status_code != 200:
+        error_class = AIProviderUnavailable if response.status_code in TRANSIENT_STATUS_CODES else AIServiceError
+        raise error_class(f"{error_label}: {response.status_code} - {response.text}")
+
+async def _post_with_retries(url: str, **kwargs) -> httpx.Response:
+    """
+    POST to a provider, retrying rate limits, server errors and network failures
+    
+    Waits 1s, 2s, 4s (plus up to 1s jitter so concurrent uploads don't retry in
+    lockstep), or the provider's Retry-After when it sends one. The last response
+    is returned as-is for the caller to check.
+    """
+    client = get_http_client()
+    for attempt in range(RETRY_ATTEMPTS):
+        last_attempt = attempt == RETRY_ATTEMPTS - 1
+        try:
+            response = await client.post(url, **kwargs)
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            logger.warning(f"Request to {url} failed ({e}), retrying")
+            retry_after = None
+        else:
+            if response.status_code not in TRANSIENT_STATUS_CODES or last_attempt:
+                return response
+            logger.warning(f"Request to {url} returned {response.status_code}, retrying")
+            retry_after = response.headers.get('retry-after')
+        
+        if retry_after is not None and retry_after.isdigit():
+            delay = min(int(retry_after), RETRY_MAX_AFTER)
+        else:
+            delay = RETRY_INITIAL_WAIT * 2 ** attempt + random.uniform(0, 1)
+        await asyncio.sleep(delay)
+
+class _CircuitBreaker:
+    """
+    Skips a provider for reset_timeout seconds after fail_max consecutive outages.
+    
+    Once the cooldown passes the provider is tried again; one more outage reopens
+    the breaker straight away, a success closes it.
+    """
+    
+    def __init__(self, name: str, fail_max: int = 3, reset_timeout: float = 60):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def closed(self) -> bool:
+        with self._lock:
+            return self.opened_at is None or time.monotonic() - self.opened_at >= self.reset_timeout
+    
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"{AI_SERVICE_LABELS[self.name]} recovered, closing circuit breaker")
+            self.failures = 0
+            self.opened_at = None
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.fail_max:
+                logger.warning(
+                    f"{AI_SERVICE_LABELS[self.name]} failed {self.failures} times in a row, "
+                    f"skipping it for {self.reset_timeout}s"
+                )
+                self.opened_at = time.monotonic()
+
+class _SharedPDF:
+    """
+    A PDF opened at most once per process_pdf call and shared by that call's AI services
+    
+    Each call owns its own instance, so concurrent calls on the same path never share
+    (or close) each other's document.
+    """
+    
+    def __init__(self, pdf_path: str):
+        self.path = pdf_path
+        # fitz documents are not safe to use from several threads at once
+        self.lock = threading.Lock()
+        self.text = None
+        self._doc = None
+        self._closed = False
+    
+    @property
+    def doc(self) -> fitz.Document:
+        """The open document, opened on first use; hold the lock while using it"""
+        if self._closed:
+            # A cancelled service's worker thread can get here after the call finished
+            raise AIServiceError("PDF was closed after processing finished")
+        if self._doc is None:
+            self._doc = _open_pdf_document(self.path)
+        return self._doc
+    
+    def close(self) -> None:
+        """Close the document; any later use raises instead of reopening it"""
+        with self.lock:
+            self._closed = True
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+
 class AIDocumentProcessor:
     """Main class for AI-powered document processing"""
     
@@ -43,6 +353,9 @@ class AIDocumentProcessor:
             'google': bool(self.google_api_key)
         }
         
+        self._claude_batchers = weakref.WeakKeyDictionary()
+        self._breakers = {name: _CircuitBreaker(name) for name, _, _ in AI_SERVICES}
+        
         logger.info(f"AI Services available: {self.services_available}")
     
     def process_pdf(self, pdf_path: str, document_type: str = "general") -> AIExtractionResult:
@@ -56,40 +369,92 @@ class AIDocumentProcessor:
         Returns:
             AIExtractionResult with extracted data
         """
+        cache_key = self._result_cache_key(pdf_path, document_type)
+        if cache_key:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"AI result cache hit for {pdf_path}")
+                return AIExtractionResult.model_validate_json(cached)
+        
+        # Keep the event loop persistent so the pooled HTTP client survives between calls
+        pdf = _SharedPDF(pdf_path)
+        try:
+            result = run_async(self._process_pdf_uncached(pdf, document_type))
+        finally:
+            pdf.close()
+        
+        # Only cache real extractions, never the fallback checklist
+        if cache_key and result.success:
+            cache.set(cache_key, result.model_dump_json(), AI_RESULT_CACHE_TIMEOUT)
+        return result
+    
+    def _result_cache_key(self, pdf_path: str, document_type: str) -> Optional[str]:
+        """Cache key for a PDF's extraction result, or None if the file can't be read"""
+        try:
+            return f"ai:{self._hash_pdf(pdf_path)}:{document_type}"
+        except PDF_READ_ERRORS as e:
+            logger.warning(f"Could not fingerprint PDF, skipping result cache: {e}")
+            return None
+    
+    async def _process_pdf_uncached(self, pdf: _SharedPDF, document_type: str) -> AIExtractionResult:
+        """
+        Run the AI services concurrently and return the preferred acceptable result.
+        
+        A result is only returned once every higher-priority service has finished,
+        so the OpenAI -> Claude -> Google preference order is kept while total
+        latency is bounded by the slowest service needed rather than their sum.
+        """
         start_time = time.time()
         
+        # Providers with an open circuit breaker are known to be down; don't wait on their timeouts
+        services = [
+            service for service in AI_SERVICES
+            if self.services_available[service[0]] and self._breakers[service[0]].closed
+        ]
+        if not services:
+            logger.error("All AI services failed, using fallback")
+            return create_fallback_result("All AI services unavailable or failed")
+        
+        # Text-native PDFs don't need rasterizing and vision tokens; Claude reads the text directly
+        service_names = {name for name, _, _ in services}
+        if 'openai' in service_names and 'claude' in service_names:
+            text_content = await asyncio.to_thread(self._get_pdf_text, pdf)
+            if self._is_text_heavy(text_content):
+                logger.info("PDF has a usable text layer, skipping OpenAI Vision")
+                services = [service for service in services if service[0] != 'openai']
+        
+        tasks = {
+            asyncio.ensure_future(getattr(self, f"_process_with_{name}")(pdf, document_type)): name
+            for name, _, _ in services
+        }
         try:
-            # Try primary AI service (OpenAI GPT-4 Vision)
-            if self.services_available['openai']:
-                try:
-                    result = self._process_with_openai(pdf_path, document_type)
-                    if result.success and result.confidence > 0.7:
-                        result.processing_time = time.time() - start_time
-                        return result
-                    logger.warning("OpenAI processing had low confidence, trying fallback")
-                except Exception as e:
-                    logger.error(f"OpenAI processing failed: {e}")
+            outcomes = {}
+            pending = set(tasks)
             
-            # Try secondary service (Claude 3.5)
-            if self.services_available['claude']:
-                try:
-                    result = self._process_with_claude(pdf_path, document_type)
-                    if result.success and result.confidence > 0.6:
-                        result.processing_time = time.time() - start_time
-                        return result
-                    logger.warning("Claude processing had low confidence, trying fallback")
-                except Exception as e:
-                    logger.error(f"Claude processing failed: {e}")
-            
-            # Try tertiary service (Google Document AI)
-            if self.services_available['google']:
-                try:
-                    result = self._process_with_google(pdf_path, document_type)
-                    if result.success:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        outcomes[name] = task.result()
+                    except Exception as e:
+                        outcomes[name] = None
+                        logger.error(f"{AI_SERVICE_LABELS[name]} processing failed: {e}")
+                        if isinstance(e, (AIProviderUnavailable, httpx.TransportError)):
+                            self._breakers[name].record_failure()
+                        continue
+                    self._breakers[name].record_success()
+                    if not self._is_acceptable(outcomes[name], name):
+                        logger.warning(f"{AI_SERVICE_LABELS[name]} processing had low confidence, trying fallback")
+                
+                # Walk services in priority order, stopping at the first one still running
+                for service_name, _, _ in services:
+                    if service_name not in outcomes:
+                        break
+                    result = outcomes[service_name]
+                    if result is not None and self._is_acceptable(result, service_name):
                         result.processing_time = time.time() - start_time
                         return result
-                except Exception as e:
-                    logger.error(f"Google Document AI processing failed: {e}")
             
             # All AI services failed, return fallback
             logger.error("All AI services failed, using fallback")
@@ -98,13 +463,28 @@ class AIDocumentProcessor:
         except Exception as e:
             logger.error(f"Critical error in AI processing: {e}")
             return create_fallback_result(f"Critical processing error: {str(e)}")
+        finally:
+            # Don't wait for slower services once a result has been chosen
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _is_text_heavy(text_content: str) -> bool:
+        """Check whether extracted text is substantial enough to skip the vision model"""
+        return len(text_content) > TEXT_HEAVY_MIN_CHARS and text_content.count("\n") > TEXT_HEAVY_MIN_LINES
+    
+    @staticmethod
+    def _is_acceptable(result: AIExtractionResult, service: str) -> bool:
+        """Check a service result against that service's confidence gate"""
+        min_confidence = AI_SERVICE_MIN_CONFIDENCE[service]
+        return result.success and (min_confidence is None or result.confidence > min_confidence)
     
-    def _process_with_openai(self, pdf_path: str, document_type: str) -> AIExtractionResult:
+    async def _process_with_openai(self, pdf: _SharedPDF, document_type: str) -> AIExtractionResult:
         """Process PDF using OpenAI GPT-4 Vision"""
         logger.info("Processing with OpenAI GPT-4 Vision")
         
-        # Convert PDF to images
-        images = self._pdf_to_images(pdf_path, max_pages=10)
+        # Convert PDF to images, rendering only the pages that will be sent
+        images = await asyncio.to_thread(self._get_pdf_images, pdf, OPENAI_MAX_IMAGES)
         if not images:
             raise AIServiceError("Failed to convert PDF to images")
         
@@ -125,16 +505,22 @@ class AIDocumentProcessor:
                 "content": [
                     {
                         "type": "text",
-                        "text": get_ai_prompt_for_document_type(document_type)
+                        "text": _prompt(document_type)
+                    }
+                ] + ([
+                    {
+                        "type": "text",
+                        "text": f"Each image shows up to {OPENAI_PAGES_PER_IMAGE} consecutive pages in reading "
+                                "order: top-left, top-right, then the next row."
                     }
-                ] + [
+                ] if OPENAI_PAGES_PER_IMAGE > 1 else []) + [
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{img_base64}",
+                            "url": image_url,
                             "detail": "high"
                         }
-                    } for img_base64 in images[:5]  # Limit to 5 images for cost control
+                    } for image_url in images
                 ]
             }
         ]
@@ -148,22 +534,20 @@ class AIDocumentProcessor:
         }
         
         # Make API request
-        response = requests.post(
+        response = await _post_with_retries(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
-            json=payload,
-            timeout=120
+            content=orjson.dumps(payload)
         )
         
-        if response.status_code != 200:
-            raise AIServiceError(f"OpenAI API error: {response.status_code} - {response.text}")
+        _check_response(response, "OpenAI API error")
         
         # Parse response
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         content = response_data['choices'][0]['message']['content']
         
         try:
-            extracted_data = json.loads(content)
+            extracted_data = orjson.loads(content)
             extracted_data['processing_method'] = 'gpt-4-vision'
             
             # Validate response
@@ -173,58 +557,111 @@ class AIDocumentProcessor:
             else:
                 raise AIServiceError(f"Invalid response format: {error_msg}")
                 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise AIServiceError(f"Failed to parse JSON response: {e}")
     
-    def _process_with_claude(self, pdf_path: str, document_type: str) -> AIExtractionResult:
+    async def _process_with_claude(self, pdf: _SharedPDF, document_type: str) -> AIExtractionResult:
         """Process PDF using Claude 3.5 Sonnet"""
         logger.info("Processing with Claude 3.5 Sonnet")
         
         # Extract text from PDF
-        text_content = self._extract_text_from_pdf(pdf_path)
+        text_content = await asyncio.to_thread(self._get_pdf_text, pdf)
         if not text_content:
             raise AIServiceError("Failed to extract text from PDF")
         
-        headers = {
+        if CLAUDE_MICROBATCH_SIZE > 1:
+            return await self._get_claude_batcher().submit(text_content, document_type)
+        return self._parse_claude_content(
+            await self._request_claude(self._claude_request_params(text_content, document_type))
+        )
+    
+    async def _request_claude(self, payload: Dict[str, Any]) -> str:
+        """Send one Messages API request and return the reply text"""
+        response = await _post_with_retries(
+            "https://api.anthropic.com/v1/messages",
+            headers=self._claude_headers(),
+            content=orjson.dumps(payload)
+        )
+        
+        _check_response(response, "Claude API error")
+        
+        response_data = orjson.loads(response.content)
+        return response_data['content'][0]['text']
+    
+    def _get_claude_batcher(self) -> '_ClaudeMicroBatcher':
+        """Return the micro-batcher for the running event loop"""
+        loop = asyncio.get_running_loop()
+        batcher = self._claude_batchers.get(loop)
+        if batcher is None:
+            batcher = self._claude_batchers[loop] = _ClaudeMicroBatcher(self)
+        return batcher
+    
+    def _claude_headers(self, *betas: str) -> Dict[str, str]:
+        """Headers for the Anthropic API"""
+        return {
             "Content-Type": "application/json",
             "x-api-key": self.claude_api_key,
-            "anthropic-version": "2023-06-01"
+            "anthropic-version": "2023-06-01",
+            "anthropic-beta": ",".join(("prompt-caching-2024-07-31",) + betas)
         }
-        
-        prompt = f"""
-{get_ai_prompt_for_document_type(document_type)}
-
-DOCUMENT CONTENT:
-{text_content[:50000]}  # Limit content to avoid token limits
-
-Please analyze this document and return the structured JSON response.
-"""
-        
-        payload = {
+    
+    @staticmethod
+    def _claude_request_params(text_content: str, document_type: str) -> Dict[str, Any]:
+        """Build the Messages API request for one document"""
+        # The instructions and the document are separate cache breakpoints: the prompt
+        # prefix is shared by every PDF of a document type, and a re-processed document
+        # reads its text from the cache instead of paying full input price again
+        return {
             "model": "claude-3-5-sonnet-20241022",
             "max_tokens": 4000,
             "temperature": 0.1,
+            "system": [
+                {
+                    "type": "text",
+                    "text": _prompt(document_type),
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ],
             "messages": [
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"DOCUMENT CONTENT:\n{text_content}",
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {
+                            "type": "text",
+                            "text": "Please analyze this document and return the structured JSON response."
+                        }
+                    ]
                 }
             ]
         }
-        
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers=headers,
-            json=payload,
-            timeout=120
-        )
-        
-        if response.status_code != 200:
-            raise AIServiceError(f"Claude API error: {response.status_code} - {response.text}")
-        
-        response_data = response.json()
-        content = response_data['content'][0]['text']
-        
+    
+    @staticmethod
+    def _claude_batch_request_params(texts: List[str], document_type: str) -> Dict[str, Any]:
+        """Build one Messages API request covering several documents"""
+        params = AIDocumentProcessor._claude_request_params("", document_type)
+        params["max_tokens"] = 8192
+        params["messages"][0]["content"] = [
+            {
+                "type": "text",
+                "text": orjson.dumps({"docs": texts}).decode()
+            },
+            {
+                "type": "text",
+                "text": f"The JSON object above holds {len(texts)} separate documents in \"docs\". "
+                        "Analyze each one independently and return a JSON array with one structured "
+                        "JSON response per document, in the same order."
+            }
+        ]
+        return params
+    
+    @staticmethod
+    def _parse_claude_content(content: str) -> AIExtractionResult:
+        """Extract and validate the JSON object in a Claude reply"""
         # Extract JSON from response (Claude might include extra text)
         try:
             # Find JSON in the response
@@ -232,26 +669,147 @@ Please analyze this document and return the structured JSON response.
             end_idx = content.rfind('}') + 1
             json_content = content[start_idx:end_idx]
             
-            extracted_data = json.loads(json_content)
-            extracted_data['processing_method'] = 'claude-3.5-sonnet'
-            
-            # Validate response
-            is_valid, error_msg, result = validate_ai_response(extracted_data)
-            if is_valid:
-                return result
-            else:
-                raise AIServiceError(f"Invalid response format: {error_msg}")
+            return AIDocumentProcessor._validate_claude_data(orjson.loads(json_content))
                 
-        except (json.JSONDecodeError, ValueError) as e:
+        except (orjson.JSONDecodeError, ValueError) as e:
             raise AIServiceError(f"Failed to parse JSON from Claude response: {e}")
     
-    def _process_with_google(self, pdf_path: str, document_type: str) -> AIExtractionResult:
+    @staticmethod
+    def _parse_claude_batch_content(content: str, count: int) -> List[AIExtractionResult]:
+        """Extract and validate the JSON array answering a multi-document message"""
+        try:
+            start_idx = content.find('[')
+            end_idx = content.rfind(']') + 1
+            extracted = orjson.loads(content[start_idx:end_idx])
+        except (orjson.JSONDecodeError, ValueError) as e:
+            raise AIServiceError(f"Failed to parse JSON from Claude response: {e}")
+        
+        if not isinstance(extracted, list) or len(extracted) != count:
+            raise AIServiceError(f"Expected {count} results from Claude, got {len(extracted) if isinstance(extracted, list) else 0}")
+        return [AIDocumentProcessor._validate_claude_data(extracted_data) for extracted_data in extracted]
+    
+    @staticmethod
+    def _validate_claude_data(extracted_data: Dict[str, Any]) -> AIExtractionResult:
+        """Validate one extracted document from Claude"""
+        extracted_data['processing_method'] = 'claude-3.5-sonnet'
+        
+        # Validate response
+        is_valid, error_msg, result = validate_ai_response(extracted_data)
+        if is_valid:
+            return result
+        else:
+            raise AIServiceError(f"Invalid response format: {error_msg}")
+    
+    def process_pdfs_batch(self, pdf_paths: List[str], document_type: str = "general") -> Dict[str, AIExtractionResult]:
+        """
+        Process many PDFs through the Anthropic Message Batches API
+        
+        Batches are billed at half price but can take minutes to hours, so this is
+        only for bulk/background ingestion. PDFs the batch fails on (and all PDFs
+        when Claude is not configured) go through the regular process_pdf chain.
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+            document_type: Type of document for specialized processing
+            
+        Returns:
+            Dict mapping each PDF path to its AIExtractionResult
+        """
+        results = {}
+        texts = {}
+        cache_keys = {}
+        
+        for pdf_path in pdf_paths:
+            cache_key = self._result_cache_key(pdf_path, document_type)
+            cached = cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                results[pdf_path] = AIExtractionResult.model_validate_json(cached)
+                continue
+            
+            cache_keys[pdf_path] = cache_key
+            if self.services_available['claude']:
+                text_content = self._extract_text_from_pdf(pdf_path)
+                if text_content:
+                    texts[pdf_path] = text_content
+        
+        if texts:
+            try:
+                batch_results = run_async(self._run_claude_batch(texts, document_type))
+            except Exception as e:
+                logger.error(f"Claude batch processing failed: {e}")
+                batch_results = {}
+            
+            for pdf_path, result in batch_results.items():
+                if self._is_acceptable(result, 'claude'):
+                    results[pdf_path] = result
+                    if cache_keys[pdf_path]:
+                        cache.set(cache_keys[pdf_path], result.model_dump_json(), AI_RESULT_CACHE_TIMEOUT)
+        
+        for pdf_path in cache_keys:
+            if pdf_path not in results:
+                results[pdf_path] = self.process_pdf(pdf_path, document_type)
+        return results
+    
+    async def _run_claude_batch(self, texts: Dict[str, str], document_type: str) -> Dict[str, AIExtractionResult]:
+        """Submit one message batch, wait for it to end and parse the succeeded entries"""
+        client = get_http_client()
+        headers = self._claude_headers("message-batches-2024-09-24")
+        
+        # custom_id only allows [a-zA-Z0-9_-], so index the paths
+        paths = list(texts)
+        payload = {
+            "requests": [
+                {
+                    "custom_id": f"pdf-{index}",
+                    "params": self._claude_request_params(texts[pdf_path], document_type)
+                }
+                for index, pdf_path in enumerate(paths)
+            ]
+        }
+        
+        response = await _post_with_retries(
+            "https://api.anthropic.com/v1/messages/batches", headers=headers, content=orjson.dumps(payload)
+        )
+        _check_response(response, "Claude batch API error")
+        batch = orjson.loads(response.content)
+        logger.info(f"Submitted Claude batch {batch['id']} with {len(paths)} documents")
+        
+        deadline = time.monotonic() + CLAUDE_BATCH_TIMEOUT
+        while batch['processing_status'] != 'ended':
+            if time.monotonic() > deadline:
+                raise AIServiceError(f"Claude batch {batch['id']} did not finish in {CLAUDE_BATCH_TIMEOUT}s")
+            await asyncio.sleep(CLAUDE_BATCH_POLL_INTERVAL)
+            response = await client.get(
+                f"https://api.anthropic.com/v1/messages/batches/{batch['id']}", headers=headers
+            )
+            _check_response(response, "Claude batch API error")
+            batch = orjson.loads(response.content)
+        
+        response = await client.get(batch['results_url'], headers=headers)
+        _check_response(response, "Claude batch results error")
+        
+        results = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = orjson.loads(line)
+            pdf_path = paths[int(entry['custom_id'].split('-', 1)[1])]
+            if entry['result']['type'] != 'succeeded':
+                logger.error(f"Claude batch entry for {pdf_path} {entry['result']['type']}")
+                continue
+            try:
+                results[pdf_path] = self._parse_claude_content(entry['result']['message']['content'][0]['text'])
+            except AIServiceError as e:
+                logger.error(f"Claude batch entry for {pdf_path} failed: {e}")
+        return results
+    
+    async def _process_with_google(self, pdf: _SharedPDF, document_type: str) -> AIExtractionResult:
         """Process PDF using Google Document AI"""
         logger.info("Processing with Google Document AI")
         
         # For now, implement a simplified version
         # In production, you would use the full Google Document AI API
-        text_content = self._extract_text_from_pdf(pdf_path)
+        text_content = await asyncio.to_thread(self._get_pdf_text, pdf)
         
         # Create a basic structured response
         # This is a simplified implementation - full Google Document AI would be more sophisticated
@@ -284,49 +842,143 @@ Please analyze this document and return the structured JSON response.
         else:
             raise AIServiceError(f"Google processing validation failed: {error_msg}")
     
-    def _pdf_to_images(self, pdf_path: str, max_pages: int = 10) -> List[str]:
-        """Convert PDF pages to base64 encoded images"""
+    @staticmethod
+    def _hash_pdf(pdf_path: str) -> str:
+        """Return the SHA-256 hex digest of the PDF file contents"""
+        return hashlib.sha256(_load_pdf_bytes(pdf_path)).hexdigest()
+    
+    def _get_pdf_text(self, pdf: _SharedPDF) -> str:
+        """Extract text from the call's PDF once, however many services need it"""
+        with pdf.lock:
+            if pdf.text is None:
+                try:
+                    doc = pdf.doc
+                except Exception as e:
+                    logger.error(f"Error extracting text from PDF: {e}")
+                    return ""
+                pdf.text = self._extract_text_from_pdf(pdf.path, doc=doc)
+            return pdf.text
+    
+    def _get_pdf_images(self, pdf: _SharedPDF, max_pages: int) -> List[str]:
+        """Render the first max_pages pages of the call's PDF"""
         try:
-            doc = fitz.open(pdf_path)
-            images = []
-            
-            for page_num in range(min(len(doc), max_pages)):
-                page = doc[page_num]
-                # Render page as image
-                mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better quality
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("png")
-                
-                # Convert to base64
-                img_base64 = base64.b64encode(img_data).decode('utf-8')
-                images.append(img_base64)
-            
-            doc.close()
-            return images
-            
+            with pdf.lock:
+                doc = pdf.doc
+                page_count = doc.page_count
+                # Content-stream size is a cheap proxy for render cost, read from the open document
+                page_weights = [len(doc[i].read_contents()) for i in range(min(page_count, max_pages))]
         except Exception as e:
             logger.error(f"Error converting PDF to images: {e}")
             return []
+        return list(self._pdf_to_images(
+            pdf.path,
+            max_pages=max_pages,
+            page_count=page_count,
+            pages_per_image=OPENAI_PAGES_PER_IMAGE,
+            page_weights=page_weights
+        ))
     
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text content from PDF"""
+    def _pdf_to_images(self, pdf_path: str, max_pages: int = 10, page_count: Optional[int] = None,
+                       pages_per_image: int = 1, page_weights: Optional[List[int]] = None) -> Iterator[str]:
+        """
+        Yield PDF pages as base64 JPEG data URLs, rendering lazily
+        
+        With pages_per_image > 1, consecutive pages are tiled into one image
+        (left to right, top to bottom, two pages per row). With page_weights,
+        the heaviest pages are dispatched to the workers first.
+        """
         try:
-            doc = fitz.open(pdf_path)
-            text_content = ""
+            if page_count is None:
+                with _open_pdf_document(pdf_path) as doc:
+                    page_count = doc.page_count
+            page_indices = list(range(min(page_count, max_pages)))
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text_content += page.get_text("text") + "\n"
+            # PyMuPDF holds the GIL while rasterizing, so pages render in worker processes
+            num_workers = min(os.cpu_count() or 1, MAX_PDF_WORKERS, len(page_indices))
+            if num_workers > 1:
+                # Dispatch the heaviest pages first so a slow page doesn't start last and
+                # leave the other workers idle
+                dispatch_order = page_indices
+                if page_weights is not None:
+                    dispatch_order = sorted(page_indices, key=page_weights.__getitem__, reverse=True)
+                # Local files are cheaper to reopen in each worker than to pickle across
+                source = pdf_path if os.path.isfile(pdf_path) else _load_pdf_bytes(pdf_path)
+                executor = get_pdf_pool()
+                futures = {
+                    i: executor.submit(render_page, (source, i))
+                    for i in dispatch_order
+                }
+                try:
+                    # Drop each future once consumed so rendered pages are freed as they're encoded
+                    rendered = (futures.pop(i).result() for i in page_indices)
+                    yield from self._encode_page_images(rendered, pages_per_image)
+                finally:
+                    # The pool outlives this call, so don't leave unneeded pages queued on it
+                    for future in futures.values():
+                        future.cancel()
+            else:
+                source = pdf_path if os.path.isfile(pdf_path) else _load_pdf_bytes(pdf_path)
+                rendered = (render_page((source, i)) for i in page_indices)
+                yield from self._encode_page_images(rendered, pages_per_image)
             
-            doc.close()
-            return text_content
+        except Exception as e:
+            logger.error(f"Error converting PDF to images: {e}")
+    
+    @staticmethod
+    def _encode_page_images(rendered: Iterator[bytes], pages_per_image: int) -> Iterator[str]:
+        """Encode rendered pages as data URLs, tiling them first if requested"""
+        rendered = iter(rendered)
+        while True:
+            group = list(islice(rendered, pages_per_image))
+            if not group:
+                return
+            img_data = group[0] if len(group) == 1 else _tile_page_images(group)
+            # Prefix the encoded bytes directly rather than decoding and formatting a second string
+            yield (PAGE_IMAGE_DATA_URL_PREFIX + base64.b64encode(img_data)).decode('ascii')
+    
+    def _extract_text_from_pdf(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> str:
+        """Extract text content from PDF, reusing an already open document if given"""
+        try:
+            own_doc = doc is None
+            if own_doc:
+                doc = _open_pdf_document(pdf_path)
+            try:
+                buffer = StringIO()
+                
+                for page in doc:
+                    buffer.write(page.get_text("text"))
+                    buffer.write("\n")
+                    # Nothing past the limit is ever sent, so stop extracting there
+                    if buffer.tell() >= MAX_TEXT_LENGTH:
+                        break
+                
+                return buffer.getvalue()[:MAX_TEXT_LENGTH]
+            finally:
+                # A page that fails to extract must not leak the document's C-side buffers
+                if own_doc:
+                    doc.close()
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             return ""
 
-# Singleton instance
-ai_processor = AIDocumentProcessor()
+@functools.lru_cache(maxsize=None)
+def get_ai_processor() -> AIDocumentProcessor:
+    """Return the shared processor, created on first use rather than at import"""
+    return AIDocumentProcessor()
+
+@atexit.register
+def _drain_claude_batchers() -> None:
+    """Finish in-flight Claude batches on shutdown, before the shared HTTP client is closed"""
+    if get_ai_processor.cache_info().currsize == 0:
+        return
+    for loop, batcher in list(get_ai_processor()._claude_batchers.items()):
+        if not loop.is_running():
+            continue
+        try:
+            asyncio.run_coroutine_threadsafe(batcher.aclose(), loop).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"Could not drain Claude batches: {e}")
 
 def process_pdf_with_ai(pdf_path: str, document_type: str = "general") -> AIExtractionResult:
     """
@@ -339,4 +991,18 @@ def process_pdf_with_ai(pdf_path: str, document_type: str = "general") -> AIExtr
     Returns:
         AIExtractionResult with extracted data
     """
-    return ai_processor.process_pdf(pdf_path, document_type)
+    return get_ai_processor().process_pdf(pdf_path, document_type)
+
+def process_pdfs_batch_with_ai(pdf_paths: List[str], document_type: str = "general") -> Dict[str, AIExtractionResult]:
+    """
+    Process PDFs in bulk at batch pricing, for background ingestion only
+    
+    Args:
+        pdf_paths: Paths to the PDF files
+        document_type: Type of document for specialized processing
+        
+    Returns:
+        Dict mapping each PDF path to its AIExtractionResult
+    """
+    return get_ai_processor().process_pdfs_batch(pdf_paths, document_type)
+
@@ -4,14 +4,37 @@ No local installation required - uses free cloud APIs and services
 """
 
 import os
-import json
+import re
 import logging
 import time
 import base64
-from typing import Optional, Dict, Any, List
-import requests
+import random
+import bisect
+import asyncio
+import hashlib
+import mmap
+import weakref
+from collections import namedtuple
+from typing import Optional, Dict, Any, List, Callable
+import httpx
+import orjson
+from groq import AsyncGroq
 from django.conf import settings
+from django.core.cache import cache
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+from .ai_common import (
+    AI_RESULT_CACHE_TIMEOUT,
+    CHARS_PER_TOKEN,
+    JSONObjectScanner,
+    cached_result,
+    get_http_client,
+    run_async
+)
 from .ai_schemas import (
     AIExtractionResult, 
     validate_ai_response, 
@@ -22,9 +45,183 @@ from .ai_schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Free-tier models used by each provider
+GROQ_MODEL = "llama3-8b-8192"
+TOGETHER_MODEL = "meta-llama/Llama-2-7b-chat-hf"
+HUGGINGFACE_MODEL = "microsoft/DialoGPT-large"
+
+# Document text budget per prompt, in tokens
+PROMPT_TOKEN_BUDGET = 1000
+HF_PROMPT_TOKEN_BUDGET = 750
+
+# Documents shorter than this, or with more distinct keywords per 500 characters than the
+# density threshold, are answered by local NLP without calling any cloud service
+LOCAL_NLP_MAX_CHARS = getattr(settings, 'CLOUD_AI_LOCAL_NLP_MAX_CHARS', 1500)
+LOCAL_NLP_MIN_KEYWORD_DENSITY = getattr(settings, 'CLOUD_AI_LOCAL_NLP_KEYWORD_DENSITY', 2)
+
+# PDFs processed at once by process_pdfs_cloud_free, to stay under free-tier request limits
+CLOUD_AI_MAX_CONCURRENT_PDFS = getattr(settings, 'CLOUD_AI_MAX_CONCURRENT_PDFS', 10)
+
+# (service, label, method, minimum confidence) in order of preference
+CLOUD_SERVICES = (
+    ('groq', 'Groq', '_process_with_groq', 0.7),
+    ('together', 'Together AI', '_process_with_together', 0.6),
+    ('huggingface', 'Hugging Face', '_process_with_huggingface_advanced', 0.5),
+)
+
+# Rate limits and server errors on the free tiers are usually gone within a second, so
+# retry them briefly before conceding to a slower provider
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 3
+RETRY_INITIAL_WAIT = 0.2
+RETRY_MAX_WAIT = 2.0
+# Longest Retry-After honoured; a provider asking for more is left to the other services
+RETRY_MAX_AFTER = 10
+
+async def _send_with_retries(client: httpx.AsyncClient, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    """
+    POST to a provider, retrying rate limits and server errors
+    
+    Waits 0.2s then 0.4s with full jitter (capped at 2s), or the provider's
+    Retry-After when it sends one. The last response is returned as-is for the
+    caller to check; a streamed response must be closed by the caller.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        request = client.build_request("POST", url, **kwargs)
+        response = await client.send(request, stream=stream)
+        if response.status_code not in TRANSIENT_STATUS_CODES or attempt == RETRY_ATTEMPTS - 1:
+            return response
+        
+        retry_after = response.headers.get('retry-after')
+        if retry_after is not None and retry_after.isdigit():
+            if int(retry_after) > RETRY_MAX_AFTER:
+                return response
+            delay = int(retry_after)
+        else:
+            delay = random.uniform(0, min(RETRY_MAX_WAIT, RETRY_INITIAL_WAIT * 2 ** attempt))
+        
+        await response.aclose()
+        logger.warning(f"Request to {url} returned {response.status_code}, retrying")
+        await asyncio.sleep(delay)
+
+# Extracted task, kept as a tuple until the result dicts are built
+_Task = namedtuple("_Task", "number description type")
+
 class CloudFreeAIProcessor:
     """Cloud-based free AI processing using various free APIs"""
     
+    # Enhanced equipment patterns by category
+    EQUIPMENT_PATTERNS = {
+        "belt_conveyor": {
+            "keywords": ["belt", "conveyor", "scraper", "pulley", "roller", "idler", "drive", "tail", "head"],
+            "systems": ["Belt Conveyor System", "Scraper System", "Drive System", "Tail Pulley", "Head Pulley"]
+        },
+        "electrical": {
+            "keywords": ["motor", "electrical", "control", "panel", "switch", "circuit", "voltage", "current"],
+            "systems": ["Motor Control System", "Electrical Panel", "Control Circuit", "Power Distribution"]
+        },
+        "hydraulic": {
+            "keywords": ["pump", "hydraulic", "cylinder", "valve", "pressure", "fluid", "reservoir", "filter"],
+            "systems": ["Hydraulic Pump System", "Cylinder Assembly", "Valve Control", "Fluid System"]
+        },
+        "mechanical": {
+            "keywords": ["bearing", "gear", "shaft", "coupling", "drive", "mechanism", "lubrication"],
+            "systems": ["Drive Mechanism", "Bearing Assembly", "Gear System", "Coupling System"]
+        }
+    }
+    
+    # Enhanced task patterns
+    TASK_PATTERNS = {
+        "inspection": ["check", "inspect", "verify", "examine", "observe", "look", "visual"],
+        "testing": ["test", "measure", "monitor", "gauge", "assess", "evaluate"],
+        "maintenance": ["clean", "lubricate", "adjust", "tighten", "replace", "repair", "service"],
+        "safety": ["lockout", "tagout", "isolate", "secure", "guard", "protect"]
+    }
+    
+    # Each system's name tokens, and the tokens of every system in a category, so a
+    # document is searched once per distinct token rather than once per system
+    _SYSTEM_TOKENS = {
+        system: frozenset(system.lower().split())
+        for info in EQUIPMENT_PATTERNS.values()
+        for system in info["systems"]
+    }
+    _CATEGORY_SYSTEM_TOKENS = {
+        category: frozenset(" ".join(info["systems"]).lower().split())
+        for category, info in EQUIPMENT_PATTERNS.items()
+    }
+    
+    # All task keywords in one scanner. The lookahead reports overlapping occurrences too;
+    # no keyword is a prefix of another, so at most one can start at any position.
+    _TASK_KEYWORD_TYPES = {
+        keyword: task_type
+        for task_type, keywords in TASK_PATTERNS.items()
+        for keyword in keywords
+    }
+    _TASK_PRIORITY = {task_type: rank for rank, task_type in enumerate(TASK_PATTERNS)}
+    _TASK_KEYWORD_REGEX = re.compile("(?=(" + "|".join(map(re.escape, _TASK_KEYWORD_TYPES)) + "))")
+    
+    # Every equipment and task keyword, for ranking lines by how much they say about the checklist
+    _ALL_KEYWORDS_REGEX = re.compile("(?=(" + "|".join(sorted({
+        re.escape(keyword)
+        for keywords in [info["keywords"] for info in EQUIPMENT_PATTERNS.values()] + list(TASK_PATTERNS.values())
+        for keyword in keywords
+    })) + "))")
+    
+    # Prompts are built once; only the document type and text are filled in per call
+    _PROMPT_TEMPLATE = """
+Analyze this industrial inspection document and extract all equipment systems and their inspection tasks.
+
+Document Type: {doc}
+
+Document Content:
+{text}
+
+Return a JSON object with this exact structure:
+{{
+  "success": true,
+  "confidence": 0.8,
+  "processing_method": "cloud-ai",
+  "systems": [
+    {{
+      "name": "System Name",
+      "description": "System description",
+      "category": "{doc}",
+      "tasks": [
+        {{
+          "number": 1,
+          "description": "Task description",
+          "type": "inspection"
+        }}
+      ]
+    }}
+  ],
+  "total_systems": 1,
+  "total_tasks": 1,
+  "extraction_quality": "good"
+}}
+
+Focus on:
+1. Identifying all equipment/systems mentioned
+2. Extracting all inspection tasks with clear descriptions
+3. Maintaining proper task numbering
+4. Including safety and maintenance tasks
+"""
+    
+    _HF_PROMPT_TEMPLATE = """
+Analyze this inspection document and extract equipment systems and tasks.
+
+Document Type: {doc}
+Content: {text}
+
+Extract all systems and their inspection tasks. Return structured data.
+"""
+    
+    # Keys and service flags are fixed at startup; slots keep per-call attribute access cheap
+    __slots__ = (
+        'hf_api_key', 'together_api_key', 'groq_api_key', '_groq_clients', '_warmups',
+        '_has_huggingface', '_has_together', '_has_groq', '_services',
+    )
+    
     def __init__(self):
         # Hugging Face API (Free tier: 1000 requests/month)
         self.hf_api_key = getattr(settings, 'HUGGINGFACE_API_KEY', None)
@@ -32,16 +229,45 @@ class CloudFreeAIProcessor:
         # OpenAI-compatible free APIs
         self.together_api_key = getattr(settings, 'TOGETHER_API_KEY', None)  # Free tier
         self.groq_api_key = getattr(settings, 'GROQ_API_KEY', None)  # Free tier
+        # AsyncGroq per event loop, wrapping that loop's pooled HTTP client
+        self._groq_clients = weakref.WeakKeyDictionary()
+        # Connection warmup task per event loop, started by the first PDF processed on it
+        self._warmups = weakref.WeakKeyDictionary()
         
         # Free services availability
-        self.free_cloud_services = {
-            'huggingface': bool(self.hf_api_key),
-            'together': bool(self.together_api_key),
-            'groq': bool(self.groq_api_key),
-            'local_nlp': True  # Always available
-        }
+        self._has_huggingface = bool(self.hf_api_key)
+        self._has_together = bool(self.together_api_key)
+        self._has_groq = bool(self.groq_api_key)
+        # Local NLP is always available and isn't listed
+        self._services = tuple(service for service in CLOUD_SERVICES if getattr(self, f"_has_{service[0]}"))
         
-        logger.info(f"Free cloud AI services available: {self.free_cloud_services}")
+        logger.info(f"Free cloud AI services available: {[name for name, _, _, _ in self._services] + ['local_nlp']}")
+    
+    def _start_warmup(self) -> None:
+        """Start warming the running loop's provider connections, once per loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._warmups:
+            self._warmups[loop] = loop.create_task(self._warm_connections())
+    
+    async def _warm_connections(self) -> None:
+        """
+        Open the pooled connections to the configured providers
+        
+        Runs alongside the first PDF's text extraction, so the TLS handshakes are done
+        by the time the prompts are sent. The models listing is the cheapest
+        authenticated endpoint, and any failure is left to the real requests.
+        """
+        endpoints = []
+        if self._has_groq:
+            endpoints.append(("https://api.groq.com/openai/v1/models", self.groq_api_key))
+        if self._has_together:
+            endpoints.append(("https://api.together.xyz/v1/models", self.together_api_key))
+        
+        client = get_http_client()
+        await asyncio.gather(
+            *(client.get(url, headers={"Authorization": f"Bearer {api_key}"}, timeout=5) for url, api_key in endpoints),
+            return_exceptions=True
+        )
     
     def process_pdf_cloud_free(self, pdf_path: str, document_type: str = "general") -> AIExtractionResult:
         """
@@ -54,48 +280,97 @@ class CloudFreeAIProcessor:
         Returns:
             AIExtractionResult with extracted data
         """
+        # Run on the long-lived loop so the pooled client's connections are reused between PDFs
+        return run_async(self.process_pdf_cloud_free_async(pdf_path, document_type))
+    
+    def process_pdfs_cloud_free(self, pdf_paths: List[str], document_type: str = "general",
+                                progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, AIExtractionResult]:
+        """
+        Process many PDFs concurrently with free cloud AI services
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+            document_type: Type of document for specialized processing
+            progress_callback: Called as (completed, total) after each PDF
+            
+        Returns:
+            Dict mapping each PDF path to its AIExtractionResult
+        """
+        return run_async(self.process_pdfs_cloud_free_async(pdf_paths, document_type, progress_callback))
+    
+    async def process_pdfs_cloud_free_async(self, pdf_paths: List[str], document_type: str = "general",
+                                            progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, AIExtractionResult]:
+        """Fan PDFs out concurrently, with at most CLOUD_AI_MAX_CONCURRENT_PDFS in flight for the free-tier rate limits"""
+        semaphore = asyncio.Semaphore(CLOUD_AI_MAX_CONCURRENT_PDFS)
+        completed = 0
+        
+        async def process_one(pdf_path: str) -> AIExtractionResult:
+            nonlocal completed
+            async with semaphore:
+                result = await self.process_pdf_cloud_free_async(pdf_path, document_type)
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, len(pdf_paths))
+            return result
+        
+        results = await asyncio.gather(*(process_one(pdf_path) for pdf_path in pdf_paths))
+        return dict(zip(pdf_paths, results))
+    
+    async def process_pdf_cloud_free_async(self, pdf_path: str, document_type: str = "general") -> AIExtractionResult:
+        """
+        Query the free cloud services concurrently and keep the most confident result
+        
+        Each service's result must clear that service's confidence threshold; the
+        enhanced local NLP result is used when none does.
+        """
         start_time = time.time()
+        self._start_warmup()
         
         try:
             # Extract text from PDF first
-            text_content = self._extract_text_from_pdf(pdf_path)
+            text_content = await asyncio.to_thread(self._get_pdf_text, pdf_path)
             if not text_content:
                 return create_fallback_result("Failed to extract text from PDF")
             
-            # Try free cloud services in order of preference
+            # Short or keyword-dense checklists are handled as well locally, without a network round trip
+            if self._is_simple_document(text_content):
+                result = await asyncio.to_thread(self._process_with_enhanced_local_nlp, text_content, document_type)
+                if result.success and result.confidence >= 0.8:
+                    result.processing_time = time.time() - start_time
+                    return result
             
-            # 1. Try Groq (Fast and free)
-            if self.free_cloud_services['groq']:
-                try:
-                    result = self._process_with_groq(text_content, document_type)
-                    if result.success and result.confidence > 0.7:
-                        result.processing_time = time.time() - start_time
-                        return result
-                except Exception as e:
-                    logger.warning(f"Groq processing failed: {e}")
+            # The local analysis runs in a worker thread while the cloud calls are in
+            # flight, so the fallback is ready the moment they all come back empty
+            local_task = asyncio.ensure_future(
+                asyncio.to_thread(self._process_with_enhanced_local_nlp, text_content, document_type)
+            )
             
-            # 2. Try Together AI (Free tier)
-            if self.free_cloud_services['together']:
-                try:
-                    result = self._process_with_together(text_content, document_type)
-                    if result.success and result.confidence > 0.6:
-                        result.processing_time = time.time() - start_time
-                        return result
-                except Exception as e:
-                    logger.warning(f"Together AI processing failed: {e}")
+            services = self._services
+            client = get_http_client()
+            try:
+                outcomes = await asyncio.gather(
+                    *(getattr(self, method)(client, text_content, document_type) for _, _, method, _ in services),
+                    return_exceptions=True
+                )
+            except BaseException:
+                local_task.cancel()
+                raise
             
-            # 3. Try Hugging Face (Free tier)
-            if self.free_cloud_services['huggingface']:
-                try:
-                    result = self._process_with_huggingface_advanced(text_content, document_type)
-                    if result.success and result.confidence > 0.5:
-                        result.processing_time = time.time() - start_time
-                        return result
-                except Exception as e:
-                    logger.warning(f"Hugging Face processing failed: {e}")
+            best = None
+            for (_, label, _, min_confidence), outcome in zip(services, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"{label} processing failed: {outcome}")
+                elif outcome.success and outcome.confidence > min_confidence:
+                    # Ties keep the earlier (preferred) service
+                    if best is None or outcome.confidence > best.confidence:
+                        best = outcome
+            if best is not None:
+                local_task.cancel()
+                best.processing_time = time.time() - start_time
+                return best
             
-            # 4. Enhanced local NLP processing (Always available)
-            result = self._process_with_enhanced_local_nlp(text_content, document_type)
+            # Enhanced local NLP processing (Always available)
+            result = await local_task
             result.processing_time = time.time() - start_time
             return result
             
@@ -103,19 +378,23 @@ class CloudFreeAIProcessor:
             logger.error(f"Cloud free AI processing failed: {e}")
             return create_fallback_result(f"Cloud AI processing error: {str(e)}")
     
-    def _process_with_groq(self, text_content: str, document_type: str) -> AIExtractionResult:
+    @cached_result('cloud-ai', GROQ_MODEL)
+    async def _process_with_groq(self, client: httpx.AsyncClient, text_content: str, document_type: str) -> AIExtractionResult:
         """Process using Groq free API (very fast)"""
         logger.info("Processing with Groq (free cloud)")
         
-        headers = {
-            "Authorization": f"Bearer {self.groq_api_key}",
-            "Content-Type": "application/json"
-        }
+        # The SDK shares the pooled HTTP/2 client, so Groq calls reuse the same connections.
+        # It retries 429/5xx itself, with jittered backoff that honours Retry-After.
+        loop = asyncio.get_running_loop()
+        groq = self._groq_clients.get(loop)
+        if groq is None:
+            groq = AsyncGroq(api_key=self.groq_api_key, http_client=client, max_retries=RETRY_ATTEMPTS - 1)
+            self._groq_clients[loop] = groq
         
         prompt = self._get_extraction_prompt(text_content, document_type)
         
-        payload = {
-            "messages": [
+        completion = await groq.chat.completions.create(
+            messages=[
                 {
                     "role": "system",
                     "content": "You are an expert at analyzing industrial inspection documents and extracting structured data."
@@ -125,27 +404,16 @@ class CloudFreeAIProcessor:
                     "content": prompt
                 }
             ],
-            "model": "llama3-8b-8192",  # Free model
-            "temperature": 0.1,
-            "max_tokens": 2000,
-            "response_format": {"type": "json_object"}
-        }
-        
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload,
+            model=GROQ_MODEL,
+            temperature=0.1,
+            max_tokens=2000,
+            response_format={"type": "json_object"},
             timeout=60
         )
-        
-        if response.status_code != 200:
-            raise Exception(f"Groq API error: {response.status_code} - {response.text}")
-        
-        response_data = response.json()
-        content = response_data['choices'][0]['message']['content']
+        content = completion.choices[0].message.content
         
         try:
-            extracted_data = json.loads(content)
+            extracted_data = orjson.loads(content)
             extracted_data['processing_method'] = 'groq-llama3-8b'
             
             # Validate response
@@ -155,10 +423,11 @@ class CloudFreeAIProcessor:
             else:
                 raise Exception(f"Invalid response format: {error_msg}")
                 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise Exception(f"Failed to parse JSON from Groq response: {e}")
     
-    def _process_with_together(self, text_content: str, document_type: str) -> AIExtractionResult:
+    @cached_result('cloud-ai', TOGETHER_MODEL)
+    async def _process_with_together(self, client: httpx.AsyncClient, text_content: str, document_type: str) -> AIExtractionResult:
         """Process using Together AI free tier"""
         logger.info("Processing with Together AI (free cloud)")
         
@@ -170,7 +439,7 @@ class CloudFreeAIProcessor:
         prompt = self._get_extraction_prompt(text_content, document_type)
         
         payload = {
-            "model": "meta-llama/Llama-2-7b-chat-hf",  # Free model
+            "model": TOGETHER_MODEL,
             "messages": [
                 {
                     "role": "system",
@@ -182,29 +451,43 @@ class CloudFreeAIProcessor:
                 }
             ],
             "max_tokens": 2000,
-            "temperature": 0.1
+            "temperature": 0.1,
+            "stream": True
         }
         
-        response = requests.post(
+        # Stream the reply and hang up as soon as the JSON object closes, rather than
+        # waiting for whatever commentary the chat model adds after it
+        scanner = JSONObjectScanner()
+        response = await _send_with_retries(
+            client,
             "https://api.together.xyz/v1/chat/completions",
+            stream=True,
             headers=headers,
-            json=payload,
+            content=orjson.dumps(payload),
             timeout=90
         )
-        
-        if response.status_code != 200:
-            raise Exception(f"Together AI error: {response.status_code} - {response.text}")
-        
-        response_data = response.json()
-        content = response_data['choices'][0]['message']['content']
+        try:
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"Together AI error: {response.status_code} - {response.text}")
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                delta = orjson.loads(data)['choices'][0].get('delta', {}).get('content') or ""
+                if scanner.feed(delta):
+                    break
+        finally:
+            await response.aclose()
         
         # Extract JSON from response
         try:
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            json_content = content[start_idx:end_idx]
+            json_content = scanner.text
             
-            extracted_data = json.loads(json_content)
+            extracted_data = orjson.loads(json_content)
             extracted_data['processing_method'] = 'together-llama2-7b'
             
             # Validate response
@@ -214,10 +497,11 @@ class CloudFreeAIProcessor:
             else:
                 raise Exception(f"Invalid response format: {error_msg}")
                 
-        except (json.JSONDecodeError, ValueError) as e:
+        except ValueError as e:
             raise Exception(f"Failed to parse JSON from Together response: {e}")
     
-    def _process_with_huggingface_advanced(self, text_content: str, document_type: str) -> AIExtractionResult:
+    @cached_result('cloud-ai', HUGGINGFACE_MODEL)
+    async def _process_with_huggingface_advanced(self, client: httpx.AsyncClient, text_content: str, document_type: str) -> AIExtractionResult:
         """Process using Hugging Face with better models"""
         logger.info("Processing with Hugging Face advanced (free cloud)")
         
@@ -226,17 +510,8 @@ class CloudFreeAIProcessor:
             "Content-Type": "application/json"
         }
         
-        # Use a better free model for text generation
-        model = "microsoft/DialoGPT-large"
         
-        prompt = f"""
-Analyze this inspection document and extract equipment systems and tasks.
-
-Document Type: {document_type}
-Content: {text_content[:3000]}
-
-Extract all systems and their inspection tasks. Return structured data.
-"""
+        prompt = self._HF_PROMPT_TEMPLATE.format(doc=document_type, text=self._budget_trim(text_content, HF_PROMPT_TOKEN_BUDGET))
         
         payload = {
             "inputs": prompt,
@@ -248,10 +523,11 @@ Extract all systems and their inspection tasks. Return structured data.
             }
         }
         
-        response = requests.post(
-            f"https://api-inference.huggingface.co/models/{model}",
+        response = await _send_with_retries(
+            client,
+            f"https://api-inference.huggingface.co/models/{HUGGINGFACE_MODEL}",
             headers=headers,
-            json=payload,
+            content=orjson.dumps(payload),
             timeout=60
         )
         
@@ -303,81 +579,54 @@ Extract all systems and their inspection tasks. Return structured data.
         """Advanced text analysis for system and task extraction"""
         systems = []
         
-        # Enhanced equipment patterns by category
-        equipment_patterns = {
-            "belt_conveyor": {
-                "keywords": ["belt", "conveyor", "scraper", "pulley", "roller", "idler", "drive", "tail", "head"],
-                "systems": ["Belt Conveyor System", "Scraper System", "Drive System", "Tail Pulley", "Head Pulley"]
-            },
-            "electrical": {
-                "keywords": ["motor", "electrical", "control", "panel", "switch", "circuit", "voltage", "current"],
-                "systems": ["Motor Control System", "Electrical Panel", "Control Circuit", "Power Distribution"]
-            },
-            "hydraulic": {
-                "keywords": ["pump", "hydraulic", "cylinder", "valve", "pressure", "fluid", "reservoir", "filter"],
-                "systems": ["Hydraulic Pump System", "Cylinder Assembly", "Valve Control", "Fluid System"]
-            },
-            "mechanical": {
-                "keywords": ["bearing", "gear", "shaft", "coupling", "drive", "mechanism", "lubrication"],
-                "systems": ["Drive Mechanism", "Bearing Assembly", "Gear System", "Coupling System"]
-            }
-        }
-        
-        # Enhanced task patterns
-        task_patterns = {
-            "inspection": ["check", "inspect", "verify", "examine", "observe", "look", "visual"],
-            "testing": ["test", "measure", "monitor", "gauge", "assess", "evaluate"],
-            "maintenance": ["clean", "lubricate", "adjust", "tighten", "replace", "repair", "service"],
-            "safety": ["lockout", "tagout", "isolate", "secure", "guard", "protect"]
-        }
-        
-        lines = text_content.lower().split('\n')
+        text_lower = text_content.lower()
+        lines = text_lower.split('\n')
         
         # Detect document-specific systems
-        category_info = equipment_patterns.get(document_type, equipment_patterns["mechanical"])
-        
-        # Find systems mentioned in the document
-        found_systems = set()
-        for line in lines:
-            for system in category_info["systems"]:
-                if any(keyword in line for keyword in system.lower().split()):
-                    found_systems.add(system)
+        category = document_type if document_type in self.EQUIPMENT_PATTERNS else "mechanical"
+        category_info = self.EQUIPMENT_PATTERNS[category]
+        
+        # Find systems mentioned in the document. Tokens still match as substrings like
+        # the original `keyword in line` checks, and never span lines, so testing each
+        # distinct token against the whole text is equivalent to checking every line
+        present_tokens = {token for token in self._CATEGORY_SYSTEM_TOKENS[category] if token in text_lower}
+        found_systems = {
+            system for system in category_info["systems"]
+            if not self._SYSTEM_TOKENS[system].isdisjoint(present_tokens)
+        }
         
         # If no specific systems found, use generic ones
         if not found_systems:
             found_systems = set(category_info["systems"][:2])  # Use first 2 generic systems
         
-        # Extract tasks for each system
-        for system_name in found_systems:
-            tasks = []
-            task_number = 1
+        # Look for task indicators on every line in a single scan of the text
+        line_task_types = self._classify_lines(text_lower)
+        
+        # Task lines don't depend on the system, so filter and clean them up once
+        task_records = []
+        for line_index, line in enumerate(lines):
+            task_type = line_task_types.get(line_index)
+            if not task_type:
+                continue
+            line = line.strip()
+            if len(line) < 10 or len(line) > 150:
+                continue
             
-            for line in lines:
-                line = line.strip()
-                if len(line) < 10 or len(line) > 150:
-                    continue
-                
-                # Look for task indicators
-                for task_type, keywords in task_patterns.items():
-                    if any(keyword in line for keyword in keywords):
-                        # Clean up the task description
-                        task_desc = line.title()
-                        if not task_desc.endswith('.'):
-                            task_desc += '.'
-                        
-                        tasks.append({
-                            "number": task_number,
-                            "description": task_desc,
-                            "type": task_type
-                        })
-                        task_number += 1
-                        break
-                
-                if task_number > 10:  # Limit tasks per system
-                    break
+            # Clean up the task description
+            task_desc = line.title()
+            if not task_desc.endswith('.'):
+                task_desc += '.'
+            task_records.append(_Task(len(task_records) + 1, task_desc, task_type))
             
-            # If no tasks found, create generic ones
-            if not tasks:
+            if len(task_records) == 10:  # Limit tasks per system
+                break
+        
+        # Extract tasks for each system
+        for system_name in found_systems:
+            if task_records:
+                tasks = [task._asdict() for task in task_records]
+            else:
+                # If no tasks found, create generic ones
                 generic_tasks = [
                     f"Perform visual inspection of {system_name.lower()}",
                     f"Check {system_name.lower()} for proper operation",
@@ -403,60 +652,89 @@ Extract all systems and their inspection tasks. Return structured data.
         
         return systems
     
+    def _classify_lines(self, text_lower: str) -> Dict[int, str]:
+        """Map each line index to the first task type (in TASK_PATTERNS order) with a keyword on it"""
+        line_starts = [0]
+        line_starts.extend(match.end() for match in re.finditer('\n', text_lower))
+        
+        line_task_types = {}
+        for match in self._TASK_KEYWORD_REGEX.finditer(text_lower):
+            task_type = self._TASK_KEYWORD_TYPES[match.group(1)]
+            line_index = bisect.bisect_right(line_starts, match.start()) - 1
+            current = line_task_types.get(line_index)
+            if current is None or self._TASK_PRIORITY[task_type] < self._TASK_PRIORITY[current]:
+                line_task_types[line_index] = task_type
+        return line_task_types
+    
+    def _is_simple_document(self, text_content: str) -> bool:
+        """Check whether a document is small or keyword-dense enough for local NLP alone"""
+        if len(text_content) < LOCAL_NLP_MAX_CHARS:
+            return True
+        keyword_hits = len(set(self._ALL_KEYWORDS_REGEX.findall(text_content.lower())))
+        return keyword_hits / (len(text_content) / 500) > LOCAL_NLP_MIN_KEYWORD_DENSITY
+    
+    def _budget_trim(self, text_content: str, max_tokens: int) -> str:
+        """
+        Fit the document text into a prompt token budget
+        
+        Instead of cutting at a fixed character offset, the lines mentioning the most
+        distinct equipment/task keywords are kept, in their original order.
+        """
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text_content) <= max_chars:
+            return text_content
+        
+        lines = [line for line in text_content.split('\n') if line.strip()]
+        scores = [len(set(self._ALL_KEYWORDS_REGEX.findall(line.lower()))) for line in lines]
+        
+        kept = []
+        used = 0
+        # sorted() is stable, so equally ranked lines are taken in document order
+        for i in sorted(range(len(lines)), key=scores.__getitem__, reverse=True):
+            cost = len(lines[i]) + 1
+            if used + cost <= max_chars:
+                kept.append(i)
+                used += cost
+            elif cost > max_chars and used + 1 < max_chars:
+                # A line longer than the whole budget (text extracted without line breaks)
+                # could never be kept, so its start fills whatever budget is left
+                lines[i] = lines[i][:max_chars - used - 1]
+                kept.append(i)
+                used = max_chars
+        return '\n'.join(lines[i] for i in sorted(kept))
+    
     def _get_extraction_prompt(self, text_content: str, document_type: str) -> str:
         """Get optimized prompt for extraction"""
-        return f"""
-Analyze this industrial inspection document and extract all equipment systems and their inspection tasks.
-
-Document Type: {document_type}
-
-Document Content:
-{text_content[:4000]}
-
-Return a JSON object with this exact structure:
-{{
-  "success": true,
-  "confidence": 0.8,
-  "processing_method": "cloud-ai",
-  "systems": [
-    {{
-      "name": "System Name",
-      "description": "System description",
-      "category": "{document_type}",
-      "tasks": [
-        {{
-          "number": 1,
-          "description": "Task description",
-          "type": "inspection"
-        }}
-      ]
-    }}
-  ],
-  "total_systems": 1,
-  "total_tasks": 1,
-  "extraction_quality": "good"
-}}
-
-Focus on:
-1. Identifying all equipment/systems mentioned
-2. Extracting all inspection tasks with clear descriptions
-3. Maintaining proper task numbering
-4. Including safety and maintenance tasks
-"""
+        return self._PROMPT_TEMPLATE.format(doc=document_type, text=self._budget_trim(text_content, PROMPT_TOKEN_BUDGET))
+    
+    def _get_pdf_text(self, pdf_path: str) -> str:
+        """Extract PDF text, reusing the cached text while the file is unchanged"""
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return self._extract_text_from_pdf(pdf_path)
+        
+        path_digest = hashlib.blake2b(pdf_path.encode(), digest_size=16).hexdigest()
+        cache_key = f"cloud-ai:text:{path_digest}:{stat.st_mtime_ns}:{stat.st_size}"
+        text_content = cache.get(cache_key)
+        if text_content is None:
+            text_content = self._extract_text_from_pdf(pdf_path)
+            if text_content:
+                cache.set(cache_key, text_content, AI_RESULT_CACHE_TIMEOUT)
+        return text_content
     
     def _extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from PDF"""
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            text_content = ""
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text_content += page.get_text("text") + "\n"
-            
-            doc.close()
-            return text_content
+            # The document is opened over a read-only memory map, so MuPDF reads the file
+            # straight from the page cache instead of through its own buffered copies.
+            # A fitz document must not be shared between threads, and get_text holds the
+            # GIL anyway, so pages are read in order; joining once avoids quadratic +=
+            with open(pdf_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as view, \
+                    fitz.open(stream=view, filetype="pdf") as doc:
+                return "".join([page.get_text("text") + "\n" for page in doc])
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
@@ -477,3 +755,18 @@ def process_pdf_with_cloud_free_ai(pdf_path: str, document_type: str = "general"
         AIExtractionResult with extracted data
     """
     return cloud_free_ai_processor.process_pdf_cloud_free(pdf_path, document_type)
+
+def process_pdfs_with_cloud_free_ai(pdf_paths: List[str], document_type: str = "general",
+                                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, AIExtractionResult]:
+    """
+    Process several PDFs concurrently with free cloud AI services
+    
+    Args:
+        pdf_paths: Paths to PDF files
+        document_type: Type of document for specialized processing
+        progress_callback: Called as (completed, total) after each PDF
+        
+    Returns:
+        Dict mapping each PDF path to its AIExtractionResult
+    """
+    return cloud_free_ai_processor.process_pdfs_cloud_free(pdf_paths, document_type, progress_callback)
@@ -4,13 +4,25 @@ Using open-source models and free APIs for intelligent document understanding
 """
 
 import os
-import json
+import re
 import logging
 import time
-from typing import Optional, Dict, Any, List
+import asyncio
+import hashlib
+from typing import Optional, Dict, Any, List, Callable
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.core.cache import cache
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+from .ai_common import CHARS_PER_TOKEN, JSONObjectScanner, cached_result, get_http_client, run_async
+from .pdf_workers import MAX_PDF_WORKERS, extract_pages_text, get_pdf_pool, page_text
 from .ai_schemas import (
     AIExtractionResult, 
     validate_ai_response, 
@@ -21,6 +33,141 @@ from .ai_schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Models used by each free service
+# 3B parameter model, good balance of speed/quality. The explicit 4-bit (Q4_K_M) tag keeps
+# memory use and CPU token rate predictable; install it with
+# `ollama pull llama3.2:3b-instruct-q4_K_M`, or set OLLAMA_MODEL to another local model.
+OLLAMA_MODEL = getattr(settings, 'OLLAMA_MODEL', 'llama3.2:3b-instruct-q4_K_M')
+HUGGINGFACE_MODEL = "microsoft/DialoGPT-medium"  # Free tier model
+
+# Instructions and schema sent as Ollama's system prompt. They are identical on every
+# request, so the server can reuse their prefill from its prompt cache.
+OLLAMA_SYSTEM_PROMPT = f"""You are an expert at analyzing industrial inspection documents. Extract equipment/systems and their inspection tasks from the document you are given.
+
+Return a JSON object with this exact structure:
+{{
+  "success": true,
+  "confidence": 0.8,
+  "processing_method": "ollama-{OLLAMA_MODEL}",
+  "systems": [
+    {{
+      "name": "System Name",
+      "description": "System description",
+      "category": "mechanical",
+      "tasks": [
+        {{
+          "number": 1,
+          "description": "Task description",
+          "type": "inspection"
+        }}
+      ]
+    }}
+  ],
+  "total_systems": 1,
+  "total_tasks": 1,
+  "extraction_quality": "good"
+}}
+
+Focus on finding all equipment/systems and their inspection tasks. Be thorough but concise.
+"""
+# Document text budget per prompt, in (estimated) tokens. Ollama's context window is
+# sized explicitly: its 2048-token default silently drops the start of longer prompts,
+# which is where the system prompt lives.
+OLLAMA_PROMPT_TOKEN_BUDGET = 2000
+OLLAMA_NUM_CTX = 4096
+HF_PROMPT_TOKEN_BUDGET = 500
+
+# Seconds an Ollama up/down probe result is trusted before probing again
+OLLAMA_PROBE_TTL = 30
+
+# How long Ollama keeps the model (and its prompt cache) loaded between requests
+OLLAMA_KEEP_ALIVE = getattr(settings, 'OLLAMA_KEEP_ALIVE', '30m')
+
+# Equipment keywords by category, in the order categories are tried for a line
+LOCAL_EQUIPMENT_PATTERNS = {
+    "belt_conveyor": [
+        "belt", "conveyor", "scraper", "pulley", "roller", "idler"
+    ],
+    "electrical": [
+        "motor", "electrical", "control", "panel", "switch", "circuit"
+    ],
+    "hydraulic": [
+        "pump", "hydraulic", "cylinder", "valve", "pressure", "fluid"
+    ],
+    "mechanical": [
+        "bearing", "gear", "shaft", "coupling", "drive", "mechanism"
+    ]
+}
+
+# Task keywords
+LOCAL_TASK_PATTERNS = [
+    "check", "inspect", "verify", "test", "examine", "monitor",
+    "measure", "clean", "lubricate", "adjust", "replace", "repair"
+]
+
+# One alternation per keyword list, so each is a single C-level scan of the line. They
+# match substrings like the `keyword in line` checks they replace ("check" still
+# matches "checked").
+_LOCAL_EQUIPMENT_REGEXES = tuple(
+    (category, re.compile("|".join(map(re.escape, keywords))))
+    for category, keywords in LOCAL_EQUIPMENT_PATTERNS.items()
+)
+_LOCAL_TASK_REGEX = re.compile("|".join(map(re.escape, LOCAL_TASK_PATTERNS)))
+
+# Every equipment keyword in a single alternation, so a line without equipment costs one
+# scan; the category is looked up from the keyword found. (Named groups per category
+# would say it directly, but they stop re from optimizing the literal alternation and
+# measured twice as slow.)
+_LOCAL_KEYWORD_CATEGORIES = {
+    keyword: category
+    for category, keywords in LOCAL_EQUIPMENT_PATTERNS.items()
+    for keyword in keywords
+}
+_LOCAL_EQUIPMENT_REGEX = re.compile("|".join(map(re.escape, _LOCAL_KEYWORD_CATEGORIES)))
+
+# Keyword -> (its category, the regexes of the categories tried before it), so a hit
+# resolves to its category with one lookup and rechecks only the earlier categories
+_LOCAL_KEYWORD_TABLE = {
+    keyword: (category, _LOCAL_EQUIPMENT_REGEXES[:list(LOCAL_EQUIPMENT_PATTERNS).index(category)])
+    for keyword, category in _LOCAL_KEYWORD_CATEGORIES.items()
+}
+
+# Extracted PDF text is reused while the file's mtime and size are unchanged
+PDF_TEXT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Fewest pages worth handing to each PDF worker process when extracting text
+# (smaller documents are extracted in-process)
+TEXT_PAGES_PER_WORKER = 32
+
+# PDFs processed at once by process_pdfs_batch. Match the Ollama server's
+# OLLAMA_NUM_PARALLEL so its parallel request slots are kept full but not oversubscribed.
+FREE_AI_MAX_CONCURRENT_PDFS = getattr(settings, 'OLLAMA_NUM_PARALLEL', 4)
+
+# (service, label, method, minimum confidence) in order of preference
+FREE_SERVICES = (
+    ('ollama', 'Ollama', '_process_with_ollama', 0.6),
+    ('huggingface', 'Hugging Face', '_process_with_huggingface', 0.5),
+)
+
+def _token_budget_slice(text: str, max_tokens: int) -> str:
+    """Leading part of text that fits max_tokens, cut at a word boundary rather than mid-word"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = max(text.rfind(' ', 0, max_chars + 1), text.rfind('\n', 0, max_chars + 1))
+    return text[:cut] if cut > 0 else text[:max_chars]
+
+def _local_system(name_line: str, category: str, task_lines: List[str]) -> Dict[str, Any]:
+    """Build a local NLP system dict from its lowercased name and task lines"""
+    return {
+        "name": name_line.title(),
+        "description": "System identified from document content",
+        "category": category,
+        "tasks": [
+            {"number": number, "description": line.title(), "type": "inspection"}
+            for number, line in enumerate(task_lines, 1)
+        ]
+    }
+
 class FreeAIProcessor:
     """Free AI processing using open-source models and free APIs"""
     
@@ -31,21 +178,44 @@ class FreeAIProcessor:
         # Ollama (Local, completely free)
         self.ollama_url = getattr(settings, 'OLLAMA_URL', 'http://localhost:11434')
         
-        # Free tier limits
-        self.free_services = {
-            'huggingface': bool(self.hf_api_key),
-            'ollama': self._check_ollama_available(),
+        # Keep-alive session for the synchronous Ollama availability probe
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Ollama is probed on first use rather than here, so importing the module
+        # (and booting every worker) doesn't wait on it
+        self._has_huggingface = bool(self.hf_api_key)
+        self._ollama_available = False
+        self._ollama_probed_at = None
+        
+        logger.info(f"Free AI services configured: huggingface={self._has_huggingface}, ollama at {self.ollama_url}")
+    
+    @property
+    def free_services(self) -> Dict[str, bool]:
+        """Services usable right now"""
+        return {
+            'huggingface': self._has_huggingface,
+            'ollama': self.ollama_available,
             'local_nlp': True  # Always available
         }
-        
-        logger.info(f"Free AI services available: {self.free_services}")
+    
+    @property
+    def ollama_available(self) -> bool:
+        """Whether Ollama is up, re-probed at most every OLLAMA_PROBE_TTL seconds"""
+        now = time.monotonic()
+        if self._ollama_probed_at is None or now - self._ollama_probed_at > OLLAMA_PROBE_TTL:
+            self._ollama_available = self._check_ollama_available()
+            self._ollama_probed_at = now
+        return self._ollama_available
     
     def _check_ollama_available(self) -> bool:
         """Check if Ollama is running locally"""
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.ollama_url}/api/tags", timeout=0.5)
             return response.status_code == 200
-        except:
+        except requests.RequestException:
             return False
     
     def process_pdf_free(self, pdf_path: str, document_type: str = "general") -> AIExtractionResult:
@@ -59,38 +229,88 @@ class FreeAIProcessor:
         Returns:
             AIExtractionResult with extracted data
         """
+        return run_async(self.process_pdf_free_async(pdf_path, document_type))
+    
+    def process_pdfs_batch(self, pdf_paths: List[str], document_type: str = "general",
+                           progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, AIExtractionResult]:
+        """
+        Process many PDFs concurrently with free AI services
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+            document_type: Type of document for specialized processing
+            progress_callback: Called as (completed, total) after each PDF
+            
+        Returns:
+            Dict mapping each PDF path to its AIExtractionResult
+        """
+        return run_async(self.process_pdfs_batch_async(pdf_paths, document_type, progress_callback))
+    
+    async def process_pdfs_batch_async(self, pdf_paths: List[str], document_type: str = "general",
+                                       progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, AIExtractionResult]:
+        """Fan PDFs out concurrently, with at most FREE_AI_MAX_CONCURRENT_PDFS in flight"""
+        semaphore = asyncio.Semaphore(FREE_AI_MAX_CONCURRENT_PDFS)
+        completed = 0
+        
+        async def process_one(pdf_path: str) -> AIExtractionResult:
+            nonlocal completed
+            async with semaphore:
+                result = await self.process_pdf_free_async(pdf_path, document_type)
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, len(pdf_paths))
+            return result
+        
+        results = await asyncio.gather(*(process_one(pdf_path) for pdf_path in pdf_paths))
+        return dict(zip(pdf_paths, results))
+    
+    async def process_pdf_free_async(self, pdf_path: str, document_type: str = "general") -> AIExtractionResult:
+        """
+        Query the free services concurrently and keep the preferred acceptable result
+        
+        Each service's result must clear that service's confidence threshold. A result
+        is returned, and slower services cancelled, as soon as every service preferred
+        over it has finished; local NLP is used when none is acceptable.
+        """
         start_time = time.time()
         
         try:
             # Extract text from PDF first
-            text_content = self._extract_text_from_pdf(pdf_path)
+            text_content = await asyncio.to_thread(self._get_pdf_text, pdf_path)
             if not text_content:
                 return create_fallback_result("Failed to extract text from PDF")
             
-            # Try free services in order of preference
-            
-            # 1. Try Ollama (Local, completely free)
-            if self.free_services['ollama']:
-                try:
-                    result = self._process_with_ollama(text_content, document_type)
-                    if result.success and result.confidence > 0.6:
-                        result.processing_time = time.time() - start_time
-                        return result
-                except Exception as e:
-                    logger.warning(f"Ollama processing failed: {e}")
-            
-            # 2. Try Hugging Face (Free tier)
-            if self.free_services['huggingface']:
-                try:
-                    result = self._process_with_huggingface(text_content, document_type)
-                    if result.success and result.confidence > 0.5:
-                        result.processing_time = time.time() - start_time
-                        return result
-                except Exception as e:
-                    logger.warning(f"Hugging Face processing failed: {e}")
+            # The Ollama probe is a blocking request when its cached status has expired
+            free_services = await asyncio.to_thread(lambda: self.free_services)
+            services = [service for service in FREE_SERVICES if free_services[service[0]]]
+            tasks = [
+                asyncio.ensure_future(getattr(self, method)(text_content, document_type))
+                for _, _, method, _ in services
+            ]
+            try:
+                pending = set(tasks)
+                while pending:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    
+                    # Walk the services in order of preference until one is still running
+                    for (_, _, _, min_confidence), task in zip(services, tasks):
+                        if not task.done():
+                            break
+                        if task.exception() is not None:
+                            continue
+                        result = task.result()
+                        if result.success and result.confidence > min_confidence:
+                            result.processing_time = time.time() - start_time
+                            return result
+            finally:
+                for (_, label, _, _), task in zip(services, tasks):
+                    if not task.done():
+                        task.cancel()
+                    elif not task.cancelled() and task.exception() is not None:
+                        logger.warning(f"{label} processing failed: {task.exception()}")
             
-            # 3. Local NLP processing (Always available)
-            result = self._process_with_local_nlp(text_content, document_type)
+            # Local NLP processing (Always available)
+            result = await asyncio.to_thread(self._process_with_local_nlp, text_content, document_type)
             result.processing_time = time.time() - start_time
             return result
             
@@ -98,77 +318,59 @@ class FreeAIProcessor:
             logger.error(f"Free AI processing failed: {e}")
             return create_fallback_result(f"Free AI processing error: {str(e)}")
     
-    def _process_with_ollama(self, text_content: str, document_type: str) -> AIExtractionResult:
+    @cached_result('free-ai', OLLAMA_MODEL)
+    async def _process_with_ollama(self, text_content: str, document_type: str) -> AIExtractionResult:
         """Process using local Ollama model (completely free)"""
         logger.info("Processing with Ollama (local)")
         
         # Use a lightweight model like llama3.2 or mistral
-        model = "llama3.2:3b"  # 3B parameter model, good balance of speed/quality
+        model = OLLAMA_MODEL
         
-        prompt = f"""
-You are an expert at analyzing industrial inspection documents. Extract equipment/systems and their inspection tasks from this document.
-
-Document Type: {document_type}
+        # Only the document varies per request, so Ollama reuses the cached system prompt prefix
+        prompt = f"""Document Type: {document_type}
 
 Document Content:
-{text_content[:8000]}  # Limit for smaller models
-
-Return a JSON object with this exact structure:
-{{
-  "success": true,
-  "confidence": 0.8,
-  "processing_method": "ollama-{model}",
-  "systems": [
-    {{
-      "name": "System Name",
-      "description": "System description",
-      "category": "mechanical",
-      "tasks": [
-        {{
-          "number": 1,
-          "description": "Task description",
-          "type": "inspection"
-        }}
-      ]
-    }}
-  ],
-  "total_systems": 1,
-  "total_tasks": 1,
-  "extraction_quality": "good"
-}}
-
-Focus on finding all equipment/systems and their inspection tasks. Be thorough but concise.
+{_token_budget_slice(text_content, OLLAMA_PROMPT_TOKEN_BUDGET)}
 """
         
         payload = {
             "model": model,
+            "system": OLLAMA_SYSTEM_PROMPT,
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": 0.1,
-                "top_p": 0.9
+                "top_p": 0.9,
+                "num_ctx": OLLAMA_NUM_CTX
             }
         }
         
-        response = requests.post(
+        # Stream the tokens and hang up as soon as the JSON object closes, rather than
+        # waiting for whatever the model generates after it
+        scanner = JSONObjectScanner()
+        async with get_http_client().stream(
+            "POST",
             f"{self.ollama_url}/api/generate",
-            json=payload,
+            headers={"Content-Type": "application/json"},
+            content=orjson.dumps(payload),
             timeout=120
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"Ollama API error: {response.status_code}")
-        
-        response_data = response.json()
-        content = response_data.get('response', '')
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Ollama API error: {response.status_code}")
+            
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                if scanner.feed(chunk.get('response', '')) or chunk.get('done'):
+                    break
         
         # Extract JSON from response
         try:
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            json_content = content[start_idx:end_idx]
+            json_content = scanner.text
             
-            extracted_data = json.loads(json_content)
+            extracted_data = orjson.loads(json_content)
             extracted_data['processing_method'] = f'ollama-{model}'
             
             # Validate response
@@ -178,15 +380,16 @@ Focus on finding all equipment/systems and their inspection tasks. Be thorough b
             else:
                 raise Exception(f"Invalid response format: {error_msg}")
                 
-        except (json.JSONDecodeError, ValueError) as e:
+        except ValueError as e:
             raise Exception(f"Failed to parse JSON from Ollama response: {e}")
     
-    def _process_with_huggingface(self, text_content: str, document_type: str) -> AIExtractionResult:
+    @cached_result('free-ai', HUGGINGFACE_MODEL)
+    async def _process_with_huggingface(self, text_content: str, document_type: str) -> AIExtractionResult:
         """Process using Hugging Face free tier"""
         logger.info("Processing with Hugging Face (free tier)")
         
         # Use a free text generation model
-        model = "microsoft/DialoGPT-medium"  # Free tier model
+        model = HUGGINGFACE_MODEL
         
         headers = {
             "Authorization": f"Bearer {self.hf_api_key}",
@@ -196,7 +399,7 @@ Focus on finding all equipment/systems and their inspection tasks. Be thorough b
         # Simplified prompt for free models
         prompt = f"""Extract equipment and inspection tasks from this document:
 
-{text_content[:2000]}
+{_token_budget_slice(text_content, HF_PROMPT_TOKEN_BUDGET)}
 
 Format as JSON with systems and tasks."""
         
@@ -209,10 +412,10 @@ Format as JSON with systems and tasks."""
             }
         }
         
-        response = requests.post(
+        response = await get_http_client().post(
             f"https://api-inference.huggingface.co/models/{model}",
             headers=headers,
-            json=payload,
+            content=orjson.dumps(payload),
             timeout=60
         )
         
@@ -269,73 +472,47 @@ Format as JSON with systems and tasks."""
         # Enhanced pattern matching with NLP techniques
         systems = []
         
-        # Common equipment keywords by category
-        equipment_patterns = {
-            "belt_conveyor": [
-                "belt", "conveyor", "scraper", "pulley", "roller", "idler"
-            ],
-            "electrical": [
-                "motor", "electrical", "control", "panel", "switch", "circuit"
-            ],
-            "hydraulic": [
-                "pump", "hydraulic", "cylinder", "valve", "pressure", "fluid"
-            ],
-            "mechanical": [
-                "bearing", "gear", "shaft", "coupling", "drive", "mechanism"
-            ]
-        }
-        
-        # Task keywords
-        task_patterns = [
-            "check", "inspect", "verify", "test", "examine", "monitor",
-            "measure", "clean", "lubricate", "adjust", "replace", "repair"
-        ]
-        
-        # Extract systems based on patterns
-        lines = text_content.split('\n')
+        # Extract systems based on patterns. The text is lowercased in one pass rather
+        # than line by line; matched lines are kept raw and only title-cased once their
+        # system is known to be saved, as tasks seen before the first system are dropped.
+        lines = text_content.lower().split('\n')
         current_system = None
         current_tasks = []
         
         for line in lines:
-            line = line.strip().lower()
-            if not line:
+            line = line.strip()
+            # Neither a system (11-99 chars) nor a task (16-199 chars); page numbers,
+            # headers and blank lines are dropped before any keyword scan
+            line_length = len(line)
+            if line_length <= 10 or line_length >= 200:
                 continue
             
             # Look for system names
-            for category, keywords in equipment_patterns.items():
-                if any(keyword in line for keyword in keywords):
-                    if len(line) > 10 and len(line) < 100:
-                        # Save previous system
-                        if current_system and current_tasks:
-                            systems.append({
-                                "name": current_system,
-                                "description": f"System identified from document content",
-                                "category": category,
-                                "tasks": current_tasks
-                            })
-                        
-                        # Start new system
-                        current_system = line.title()
-                        current_tasks = []
+            match = _LOCAL_EQUIPMENT_REGEX.search(line) if line_length < 100 else None
+            if match:
+                # The first keyword found may not be from the first matching category
+                # in order, so earlier categories are checked before settling on it
+                category, earlier_regexes = _LOCAL_KEYWORD_TABLE[match.group()]
+                for earlier_category, keywords_regex in earlier_regexes:
+                    if keywords_regex.search(line):
+                        category = earlier_category
                         break
+                
+                # Save previous system
+                if current_system and current_tasks:
+                    systems.append(_local_system(current_system, category, current_tasks))
+                
+                # Start new system
+                current_system = line
+                current_tasks = []
             
             # Look for tasks
-            if any(keyword in line for keyword in task_patterns):
-                if len(line) > 15 and len(line) < 200:
-                    current_tasks.append({
-                        "number": len(current_tasks) + 1,
-                        "description": line.title(),
-                        "type": "inspection"
-                    })
+            if line_length > 15 and _LOCAL_TASK_REGEX.search(line):
+                current_tasks.append(line)
         
         # Add the last system
         if current_system and current_tasks:
-            systems.append({
-                "name": current_system,
-                "description": f"System identified from document content",
-                "category": "general",
-                "tasks": current_tasks
-            })
+            systems.append(_local_system(current_system, "general", current_tasks))
         
         # If no systems found, create a generic one
         if not systems:
@@ -385,19 +562,44 @@ Format as JSON with systems and tasks."""
         else:
             return create_fallback_result(f"Local NLP validation failed: {error_msg}")
     
+    def _get_pdf_text(self, pdf_path: str) -> str:
+        """Extract PDF text, reusing the cached text while the file is unchanged"""
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return self._extract_text_from_pdf(pdf_path)
+        
+        path_digest = hashlib.sha256(pdf_path.encode()).hexdigest()
+        cache_key = f"free-ai:text:{path_digest}:{stat.st_mtime_ns}:{stat.st_size}"
+        text_content = cache.get(cache_key)
+        if text_content is None:
+            text_content = self._extract_text_from_pdf(pdf_path)
+            if text_content:
+                cache.set(cache_key, text_content, PDF_TEXT_CACHE_TIMEOUT)
+        return text_content
+    
     def _extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from PDF"""
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            text_content = ""
+            # The document is closed even if a page fails to extract, so it can't leak
+            with fitz.open(pdf_path) as doc:
+                # PyMuPDF holds the GIL and its documents aren't thread-safe, so large
+                # documents are split into page ranges extracted by worker processes
+                page_count = len(doc)
+                num_workers = min(os.cpu_count() or 1, MAX_PDF_WORKERS, page_count // TEXT_PAGES_PER_WORKER)
+                if num_workers <= 1:
+                    # Collect the pages and join once; += would recopy all earlier text per page
+                    parts = []
+                    for page_num in range(page_count):
+                        parts.append(page_text(doc[page_num]))
+                        parts.append("\n")
+                    return "".join(parts)
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text_content += page.get_text("text") + "\n"
-            
-            doc.close()
-            return text_content
+            bounds = [page_count * i // num_workers for i in range(num_workers + 1)]
+            return "".join(get_pdf_pool().map(
+                extract_pages_text,
+                [(pdf_path, start, stop) for start, stop in zip(bounds, bounds[1:])]
+            ))
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
@@ -418,3 +620,18 @@ def process_pdf_with_free_ai(pdf_path: str, document_type: str = "general") -> A
         AIExtractionResult with extracted data
     """
     return free_ai_processor.process_pdf_free(pdf_path, document_type)
+
+def process_pdfs_with_free_ai(pdf_paths: List[str], document_type: str = "general",
+                              progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, AIExtractionResult]:
+    """
+    Process several PDFs concurrently with free AI services
+    
+    Args:
+        pdf_paths: Paths to PDF files
+        document_type: Type of document for specialized processing
+        progress_callback: Called as (completed, total) after each PDF
+        
+    Returns:
+        Dict mapping each PDF path to its AIExtractionResult
+    """
+    return free_ai_processor.process_pdfs_batch(pdf_paths, document_type, progress_callback)
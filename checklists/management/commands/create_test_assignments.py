@@ -1,7 +1,9 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
 from django.utils import timezone
 from datetime import date, timedelta
-from checklists.models import ChecklistAssignment, InspectionSystem, ChecklistExecution
+from checklists.models import ChecklistAssignment, AssignmentSystem, InspectionSystem, ChecklistExecution
 from users.models import SupabaseUser
 from sectors.models import Sector
 
@@ -68,35 +70,49 @@ class Command(BaseCommand):
                 }
             ]
 
-            created_count = 0
-            for assignment_data in assignments_data:
-                assignment, created = ChecklistAssignment.objects.get_or_create(
+            # Skip titles that already exist, as get_or_create did, then create the rest
+            # with their system links and executions in a few bulk inserts
+            existing_titles = set(
+                ChecklistAssignment.objects.filter(
+                    title__in=[assignment_data['title'] for assignment_data in assignments_data]
+                ).values_list('title', flat=True)
+            )
+            new_assignments = [
+                ChecklistAssignment(
                     title=assignment_data['title'],
-                    defaults={
-                        'description': assignment_data['description'],
-                        'technician': technician_user,
-                        'assigned_by': supervisor_user,
-                        'sector': sector,
-                        'due_date': assignment_data['due_date'],
-                        'status': assignment_data['status']
-                    }
+                    description=assignment_data['description'],
+                    technician=technician_user,
+                    assigned_by=supervisor_user,
+                    sector=sector,
+                    due_date=assignment_data['due_date'],
+                    status=assignment_data['status']
                 )
+                for assignment_data in assignments_data
+                if assignment_data['title'] not in existing_titles
+            ]
+            
+            with transaction.atomic():
+                ChecklistAssignment.objects.bulk_create(new_assignments)
                 
-                if created:
-                    # Add the system to the assignment
-                    assignment.systems.add(system)
-                    
-                    # Create execution for the assignment
-                    execution, exec_created = ChecklistExecution.objects.get_or_create(
+                # Add the system to each assignment
+                AssignmentSystem.objects.bulk_create([
+                    AssignmentSystem(assignment=assignment, system=system)
+                    for assignment in new_assignments
+                ])
+                
+                # Create execution for each assignment
+                ChecklistExecution.objects.bulk_create([
+                    ChecklistExecution(
                         assignment=assignment,
-                        defaults={
-                            'technician': technician_user,
-                            'status': 'not_started'
-                        }
+                        technician=technician_user,
+                        status='not_started'
                     )
-                    
-                    created_count += 1
-                    self.stdout.write(f"Created assignment: {assignment.title}")
+                    for assignment in new_assignments
+                ])
+            
+            for assignment in new_assignments:
+                self.stdout.write(f"Created assignment: {assignment.title}")
+            created_count = len(new_assignments)
 
             self.stdout.write(
                 self.style.SUCCESS(f"Successfully created {created_count} test assignments")
@@ -106,10 +122,12 @@ class Command(BaseCommand):
             total_assignments = ChecklistAssignment.objects.count()
             self.stdout.write(f"Total assignments in database: {total_assignments}")
             
-            # Show assignments by user
-            for user in SupabaseUser.objects.filter(role='Technician'):
-                user_assignments = ChecklistAssignment.objects.filter(technician=user).count()
-                self.stdout.write(f"Assignments for {user.email}: {user_assignments}")
+            # Show assignments by user, counted in the same query as the users
+            technicians = SupabaseUser.objects.filter(role='Technician').annotate(
+                assignment_count=Count('checklist_assignments')
+            ).values_list('email', 'assignment_count')
+            for email, user_assignments in technicians:
+                self.stdout.write(f"Assignments for {email}: {user_assignments}")
 
         except Exception as e:
             self.stdout.write(
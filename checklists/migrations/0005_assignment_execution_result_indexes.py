@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-16 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checklists', '0004_alter_checklistexecution_technician'),
+        ('sectors', '0002_alter_sector_code_alter_sector_description_and_more'),
+        ('users', '0004_delete_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checklistassignment',
+            index=models.Index(fields=['technician', '-due_date'], name='ca_tech_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistassignment',
+            index=models.Index(fields=['sector', 'status'], name='ca_sec_stat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistexecution',
+            index=models.Index(fields=['technician', '-completed_at'], name='ce_tech_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskresult',
+            index=models.Index(fields=['execution', 'status'], name='tr_exec_status_idx'),
+        ),
+    ]
@@ -140,6 +140,10 @@ class ChecklistAssignment(models.Model):
         ordering = ['-due_date']
         verbose_name = 'Checklist Assignment'
         verbose_name_plural = 'Checklist Assignments'
+        indexes = [
+            models.Index(fields=['technician', '-due_date'], name='ca_tech_due_idx'),
+            models.Index(fields=['sector', 'status'], name='ca_sec_stat_idx'),
+        ]
 
 
 class AssignmentSystem(models.Model):
@@ -197,6 +201,9 @@ class ChecklistExecution(models.Model):
         ordering = ['-completed_at']
         verbose_name = 'Checklist Execution'
         verbose_name_plural = 'Checklist Executions'
+        indexes = [
+            models.Index(fields=['technician', '-completed_at'], name='ce_tech_completed_idx'),
+        ]
 
     @property
     def progress_percentage(self):
@@ -249,6 +256,9 @@ class TaskResult(models.Model):
         verbose_name = 'Task Result'
         verbose_name_plural = 'Task Results'
         unique_together = ['execution', 'task']
+        indexes = [
+            models.Index(fields=['execution', 'status'], name='tr_exec_status_idx'),
+        ]
 
 
 class TaskPhoto(models.Model):
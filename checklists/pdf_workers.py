@@ -0,0 +1,78 @@
+"""
+Worker Processes for PDF Rendering and Text Extraction
+PyMuPDF holds the GIL while it works, so CPU-heavy page work runs in a shared process pool
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Tuple
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on worker processes shared by all PDF jobs
+MAX_PDF_WORKERS = 4
+
+# JPEG is several times smaller than PNG for scanned pages, with no visible loss for vision models
+PAGE_IMAGE_JPEG_QUALITY = 85
+# Longest side of a rendered page; an A4 page at 2x zoom is ~1700px
+PAGE_IMAGE_MAX_PIXELS = 2048
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool for PDF work, starting it on first use
+
+    Workers come from a forkserver (or are spawned) rather than forked: the server
+    process runs event loop and HTTP client threads, and forking it could copy a lock
+    one of them holds. Workers only import this module, and live as long as the pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_PDF_WORKERS,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _pool
+
+def render_page(args: Tuple[Any, int]) -> bytes:
+    """Render one PDF page to JPEG bytes (runs in a worker process)"""
+    source, page_num = args
+    # fitz documents can't be pickled, so each worker opens its own from a local path or the bytes
+    doc = fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+    try:
+        page = doc[page_num]
+        # 2x zoom for better quality, but large-format drawings are capped at PAGE_IMAGE_MAX_PIXELS
+        scale = min(2.0, PAGE_IMAGE_MAX_PIXELS / max(page.rect.width, page.rect.height))
+        if scale < 2.0:
+            logger.info(f"Rendering page {page_num + 1} at scale {scale:.2f} ({page.rect.width:.0f}x{page.rect.height:.0f}pt)")
+        mat = fitz.Matrix(scale, scale)
+        pix = page.get_pixmap(matrix=mat)
+        return pix.tobytes("jpeg", jpg_quality=PAGE_IMAGE_JPEG_QUALITY)
+    finally:
+        doc.close()
+
+def page_text(page) -> str:
+    """
+    Plain text of a PDF page, with ligature glyphs expanded
+    
+    Keeping "ﬁ"/"ﬂ" as single characters (PyMuPDF's default) would hide keywords
+    such as "fluid" or "filter" from the keyword scans.
+    """
+    return page.get_text("text", flags=fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES)
+
+def extract_pages_text(args: Tuple[str, int, int]) -> str:
+    """Extract the text of pages [start, stop) of a PDF (runs in a worker process)"""
+    pdf_path, start, stop = args
+    with fitz.open(pdf_path) as doc:
+        return "".join([page_text(doc[page_num]) + "\n" for page_num in range(start, stop)])
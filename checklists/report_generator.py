@@ -1,7 +1,10 @@
 """
 PDF Report Generator for Checklist Executions
 """
+import functools
+import io
 import os
+from collections import Counter
 from datetime import datetime
 from django.conf import settings
 from django.http import HttpResponse
@@ -13,6 +16,41 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 
+@functools.cache
+def _get_styles():
+    """Build the custom paragraph styles once; they are the same for every report."""
+    styles = getSampleStyleSheet()
+    
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    )
+    
+    # Header style
+    header_style = ParagraphStyle(
+        'CustomHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        textColor=colors.darkblue
+    )
+    
+    # Normal style
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6
+    )
+    
+    return title_style, header_style, normal_style
+
+
 class ChecklistReportGenerator:
     """Generate PDF reports for checklist executions."""
     
@@ -20,37 +58,12 @@ class ChecklistReportGenerator:
         self.execution = execution
         self.assignment = execution.assignment
         self.technician = execution.technician
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
+        self.title_style, self.header_style, self.normal_style = _get_styles()
     
-    def setup_custom_styles(self):
-        """Setup custom paragraph styles for the report."""
-        # Title style
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        )
-        
-        # Header style
-        self.header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.darkblue
-        )
-        
-        # Normal style
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6
-        )
+    def get_filename(self):
+        """Return a timestamped filename for the report."""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f'execution_{self.execution.id}_report_{timestamp}.pdf'
     
     def generate_pdf(self):
         """Generate the PDF report and return the file path."""
@@ -58,14 +71,17 @@ class ChecklistReportGenerator:
         reports_dir = os.path.join(settings.MEDIA_ROOT, 'reports')
         os.makedirs(reports_dir, exist_ok=True)
         
-        # Generate filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'execution_{self.execution.id}_report_{timestamp}.pdf'
+        filename = self.get_filename()
         filepath = os.path.join(reports_dir, filename)
+        self.build_pdf(filepath)
         
+        return filepath, filename
+    
+    def build_pdf(self, target):
+        """Render the report into target, a file path or a writable file-like object."""
         # Create PDF document
         doc = SimpleDocTemplate(
-            filepath,
+            target,
             pagesize=A4,
             rightMargin=72,
             leftMargin=72,
@@ -112,7 +128,7 @@ class ChecklistReportGenerator:
         story.append(Paragraph("Inspection Results", self.header_style))
         
         # Get task results
-        task_results = self.execution.task_results.all().select_related('task', 'task__system')
+        task_results = list(self.execution.task_results.all().select_related('task', 'task__system'))
         
         if task_results:
             # Group by system
@@ -141,7 +157,7 @@ class ChecklistReportGenerator:
                     ])
                 
                 tasks_table = Table(task_data, colWidths=[3*inch, 1*inch, 2*inch])
-                tasks_table.setStyle(TableStyle([
+                table_style = [
                     ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                     ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                     ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -151,18 +167,16 @@ class ChecklistReportGenerator:
                     ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
                     ('GRID', (0, 0), (-1, -1), 1, colors.black),
                     ('VALIGN', (0, 0), (-1, -1), 'TOP')
-                ]))
+                ]
                 
-                # Color code status cells
+                # Color code status cells, applied together with the base style
                 for i, result in enumerate(results, 1):
                     if result.status == 'ok':
-                        tasks_table.setStyle(TableStyle([
-                            ('BACKGROUND', (1, i), (1, i), colors.lightgreen)
-                        ]))
+                        table_style.append(('BACKGROUND', (1, i), (1, i), colors.lightgreen))
                     elif result.status == 'not_ok':
-                        tasks_table.setStyle(TableStyle([
-                            ('BACKGROUND', (1, i), (1, i), colors.lightcoral)
-                        ]))
+                        table_style.append(('BACKGROUND', (1, i), (1, i), colors.lightcoral))
+                
+                tasks_table.setStyle(TableStyle(table_style))
                 
                 story.append(tasks_table)
                 story.append(Spacer(1, 15))
@@ -172,9 +186,11 @@ class ChecklistReportGenerator:
         # Summary
         story.append(Paragraph("Summary", self.header_style))
         
-        total_tasks = task_results.count()
-        ok_tasks = task_results.filter(status='ok').count()
-        not_ok_tasks = task_results.filter(status='not_ok').count()
+        # Counted from the results already loaded above rather than with more queries
+        status_counts = Counter(result.status for result in task_results)
+        total_tasks = len(task_results)
+        ok_tasks = status_counts['ok']
+        not_ok_tasks = status_counts['not_ok']
         pending_tasks = total_tasks - ok_tasks - not_ok_tasks
         
         summary_data = [
@@ -200,14 +216,13 @@ class ChecklistReportGenerator:
         
         # Build PDF
         doc.build(story)
-        
-        return filepath, filename
     
     def get_download_response(self):
         """Generate PDF and return HTTP response for download."""
-        filepath, filename = self.generate_pdf()
+        # Rendered in memory; a download doesn't need a copy under MEDIA_ROOT
+        buffer = io.BytesIO()
+        self.build_pdf(buffer)
         
-        with open(filepath, 'rb') as pdf_file:
-            response = HttpResponse(pdf_file.read(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{self.get_filename()}"'
+        return response
@@ -34,6 +34,12 @@ class InspectionPDFSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
         
 
+def _task_count(system):
+    """Task count of a system, from the num_tasks annotation when the queryset has it"""
+    num_tasks = getattr(system, 'num_tasks', None)
+    return system.task_count if num_tasks is None else num_tasks
+
+
 class ChecklistTaskSerializer(serializers.ModelSerializer):
     """Serializer for ChecklistTask model."""
     
@@ -55,7 +61,7 @@ class InspectionSystemSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'task_count')
         
     def get_task_count(self, obj):
-        return obj.task_count
+        return _task_count(obj)
 
 
 class InspectionSystemListSerializer(serializers.ModelSerializer):
@@ -69,7 +75,7 @@ class InspectionSystemListSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'task_count')
         
     def get_task_count(self, obj):
-        return obj.task_count
+        return _task_count(obj)
 
 
 class TaskPhotoSerializer(serializers.ModelSerializer):
@@ -104,7 +110,7 @@ class ChecklistExecutionSerializer(serializers.ModelSerializer):
     """Serializer for ChecklistExecution model with nested task results."""
 
     task_results = TaskResultSerializer(many=True, read_only=True)
-    progress_percentage = serializers.IntegerField(read_only=True)
+    progress_percentage = serializers.SerializerMethodField()
 
     class Meta:
         model = ChecklistExecution
@@ -130,6 +136,15 @@ class ChecklistExecutionSerializer(serializers.ModelSerializer):
         # For other requests (GET, PUT, etc.), include full data
         return super().to_representation(instance)
 
+    def get_progress_percentage(self, obj):
+        # ChecklistExecutionViewSet annotates the task counts, saving two COUNTs per execution
+        total = getattr(obj, 'task_total', None)
+        if total is None:
+            return obj.progress_percentage
+        if total == 0:
+            return 0
+        return int((obj.task_done / total) * 100)
+
     
     def update(self, instance, validated_data):
         """Update the execution status and timestamps appropriately."""
@@ -175,13 +190,9 @@ class ChecklistAssignmentSerializer(serializers.ModelSerializer):
         # Create the assignment
         assignment = super().create(validated_data)
         
-        # Add the systems
-        for system_id in systems:
-            try:
-                system = InspectionSystem.objects.get(pk=system_id)
-                assignment.systems.add(system)
-            except InspectionSystem.DoesNotExist:
-                pass
+        # Add the systems, skipping ids that don't exist
+        valid_ids = list(InspectionSystem.objects.filter(pk__in=systems).values_list('id', flat=True))
+        assignment.systems.set(valid_ids)
         
         # Create the execution
         execution = ChecklistExecution.objects.create(
@@ -189,12 +200,13 @@ class ChecklistAssignmentSerializer(serializers.ModelSerializer):
             technician=assignment.technician
         )
         
-        # Create task results for all tasks in the assigned systems
-        for system in assignment.systems.all():
-            for task in system.tasks.all():
-                TaskResult.objects.create(
-                    execution=execution,
-                    task=task
-                )
+        # Create task results for all tasks in the assigned systems, in one INSERT
+        task_ids = ChecklistTask.objects.filter(
+            system__assignments=assignment
+        ).values_list('id', flat=True)
+        TaskResult.objects.bulk_create(
+            [TaskResult(execution=execution, task_id=task_id) for task_id in task_ids],
+            batch_size=500
+        )
         
         return assignment 
\ No newline at end of file
@@ -1,11 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.db import connection, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.conf import settings
-import threading
 
 from .models import InspectionPDF
 from .utils import process_inspection_pdf
 
+# Bounded pool for background processing, so a burst of uploads queues up instead of
+# starting a thread (and a database connection) per PDF
+_pdf_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PDF_WORKERS', 2),
+    thread_name_prefix='pdf-processing'
+)
+
 
 def process_pdf_in_background(inspection_pdf_id):
     """
@@ -21,6 +31,9 @@ def process_pdf_in_background(inspection_pdf_id):
         process_inspection_pdf(inspection_pdf)
     except Exception as e:
         print(f"Error in background PDF processing: {str(e)}")
+    finally:
+        # Pool threads outlive the request cycle, which is what normally closes connections
+        connection.close()
 
 
 @receiver(post_save, sender=InspectionPDF)
@@ -30,9 +43,7 @@ def auto_process_pdf(sender, instance, created, **kwargs):
     Only process newly created PDFs that haven't been processed yet.
     """
     if created and not instance.processed:
-        # Use threading for a simple background task system
-        # For production, consider using Celery or another task queue
-        threading.Thread(
-            target=process_pdf_in_background, 
-            args=(instance.id,)
-        ).start() 
\ No newline at end of file
+        # Use a thread pool for a simple background task system
+        # For production, consider using Celery or another task queue.
+        # Queued only once the row is committed, so the worker is sure to find it.
+        transaction.on_commit(partial(_pdf_executor.submit, process_pdf_in_background, instance.id)) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions, status, filters, parsers
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, Prefetch, Q
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
@@ -217,8 +217,8 @@ class InspectionSystemViewSet(viewsets.ReadOnlyModelViewSet):
         """Filter systems based on user's role and sector."""
         user = self.request.user
 
-        # Base queryset without task_count annotation
-        queryset = InspectionSystem.objects.all()
+        # Base queryset, with task counts from one GROUP BY
+        queryset = InspectionSystem.objects.annotate(num_tasks=Count('tasks'))
 
         # Filter by sector
         if not user.is_admin:
@@ -278,8 +278,13 @@ class ChecklistAssignmentViewSet(viewsets.ModelViewSet):
         """Filter assignments based on user's role and sector."""
         user = self.request.user
 
-        # Base queryset
-        queryset = ChecklistAssignment.objects.all()
+        # Base queryset, with the related rows the serializer reads loaded up front
+        queryset = ChecklistAssignment.objects.select_related(
+            'technician', 'assigned_by', 'sector'
+        ).prefetch_related(
+            # Meta.ordering isn't applied to aggregate queries, hence the explicit order_by
+            Prefetch('systems', queryset=InspectionSystem.objects.annotate(num_tasks=Count('tasks')).order_by('name'))
+        )
 
         # Filter by sector, role, and status
         if user.is_admin:
@@ -373,7 +378,10 @@ class ChecklistExecutionViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         # Base queryset with progress calculation
-        queryset = ChecklistExecution.objects.all()
+        queryset = ChecklistExecution.objects.annotate(
+            task_total=Count('task_results'),
+            task_done=Count('task_results', filter=~Q(task_results__status='pending'))
+        )
 
         # Add filter logic
         if user.is_admin:
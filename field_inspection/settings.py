@@ -193,7 +193,11 @@ SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY", "")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:3b-instruct-q4_K_M")
 ENABLE_CLOUD_FREE_AI_PROCESSING = os.getenv("ENABLE_CLOUD_FREE_AI_PROCESSING", "false").lower() == "true"
 ENABLE_AI_PROCESSING = os.getenv("ENABLE_AI_PROCESSING", "false").lower() == "true"
 ENABLE_FREE_AI_PROCESSING = os.getenv("ENABLE_FREE_AI_PROCESSING", "false").lower() == "true"
 
+
+# Uploaded PDFs processed at once in the background
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))